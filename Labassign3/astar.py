@@ -1,49 +1,58 @@
 from pyMaze import maze,agent,textLabel
-from queue import PriorityQueue
+from heapq import heappush,heappop
+from array import array
+from bfs import moveTable,fwdPathFrom
 def h(cell1,cell2):
     x1,y1=cell1
     x2,y2=cell2
 
     return abs(x1-x2) + abs(y1-y2)
-def aStar(m):
-    start=(m.rows,m.cols)
-    g_score={cell:float('inf') for cell in m.grid}
-    g_score[start]=0
-    f_score={cell:float('inf') for cell in m.grid}
-    f_score[start]=h(start,(1,1))
-
-    open=PriorityQueue()
-    open.put((h(start,(1,1)),h(start,(1,1)),start))
-    aPath={}
-    while not open.empty():
-        currCell=open.get()[2]
-        if currCell==(1,1):
+def aStar(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    walls=m._openSides()
+    moves,offsets=moveTable(m)
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    gx,gy=goal[0]-1,goal[1]-1
+    # Flat scores, only the cells pushed on the heap are ever looked at
+    g_score=array('i',[len(walls)])*len(walls)
+    g_score[s]=0
+    closed=bytearray(len(walls))
+    came=bytearray(len(walls))
+    came[s]=5
+    open=[(h(start,goal),h(start,goal),s)]
+    expanded=0
+    pushed=1
+    track=stats is not None
+    peak=1
+    while open:
+        currCell=heappop(open)[2]
+        if currCell==t:
             break
-        for d in 'ESNW':
-            if m.maze_map[currCell][d]==True:
-                if d=='E':
-                    childCell=(currCell[0],currCell[1]+1)
-                if d=='W':
-                    childCell=(currCell[0],currCell[1]-1)
-                if d=='N':
-                    childCell=(currCell[0]-1,currCell[1])
-                if d=='S':
-                    childCell=(currCell[0]+1,currCell[1])
-
-                temp_g_score=g_score[currCell]+1
-                temp_f_score=temp_g_score+h(childCell,(1,1))
-
-                if temp_f_score < f_score[childCell]:
-                    g_score[childCell]= temp_g_score
-                    f_score[childCell]= temp_f_score
-                    open.put((temp_f_score,h(childCell,(1,1)),childCell))
-                    aPath[childCell]=currCell
-    fwdPath={}
-    cell=(1,1)
-    while cell!=start:
-        fwdPath[aPath[cell]]=cell
-        cell=aPath[cell]
-    return fwdPath
+        if closed[currCell]:
+            # A stale entry, the cell was reached again with a lower score
+            continue
+        closed[currCell]=1
+        expanded+=1
+        temp_g_score=g_score[currCell]+1
+        for d,o in moves[walls[currCell]]:
+            childCell=currCell+o
+            if temp_g_score<g_score[childCell]:
+                g_score[childCell]=temp_g_score
+                came[childCell]=d
+                hc=abs(childCell//cols-gx)+abs(childCell%cols-gy)
+                heappush(open,(temp_g_score+hc,hc,childCell))
+                pushed+=1
+        if track and len(open)>peak:
+            peak=len(open)
+    if track:
+        # The goal is taken off the heap too
+        stats.expanded=expanded+1
+        stats.pushed=pushed
+        stats.peak_frontier=peak
+    return fwdPathFrom(m,came,offsets,start,goal)
 
 if __name__=='__main__':
     m=maze(5,5)
@@ -0,0 +1,285 @@
+"""
+Headless benchmark of the maze solvers
+
+Sweeps maze sizes, loop percentages, generators and seeds, times every
+solver on every maze and writes the results as JSON and/or CSV. A previous
+JSON result can be given as a baseline to flag regressions.
+The mazes are spread over a pool of worker processes (--workers).
+
+    python benchmark.py --sizes 10 100 1000 --loops 0 20 100 --seeds 3 --json new.json
+    python benchmark.py --json new.json --baseline old.json
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyMaze
+from pyMaze import maze
+from bfs import BFS
+from dfs import DFS
+from astar import aStar
+from bidirectional import biBFS, biAStar
+from jps import jumpPointSearch
+from junction import junctionSearch
+from solverstats import SolverStats
+
+SOLVERS = {
+    'BFS': BFS,
+    'DFS': DFS,
+    'aStar': aStar,
+    'biBFS': biBFS,
+    'biAStar': biAStar,
+    'jumpPointSearch': jumpPointSearch,
+    'junctionSearch': junctionSearch,
+}
+SIZES = [10, 50, 100, 500, 1000, 2000]
+LOOPS = [0, 20, 100]
+FIELDS = ['size', 'loop_percent', 'algorithm', 'solver', 'runs', 'median_ms', 'p95_ms',
+          'expanded', 'pushed', 'peak_frontier', 'peak_memory', 'path_length', 'generate_ms']
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile
+
+    Args:
+        values (list): The values
+        p (float): Percentile (0-100)
+    """
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def benchmark_solver(solver, m, warmup, repeat):
+    """
+    Time one solver on one maze
+
+    Args:
+        solver (callable): The solver
+        m (maze): The maze
+        warmup (int): Untimed runs first
+        repeat (int): Timed runs
+
+    Returns:
+        (list of times in ms, SolverStats of the last run, path length)
+    """
+    stats = SolverStats()
+    for _ in range(warmup):
+        solver(m)
+    times = []
+    for _ in range(repeat):
+        # Setting the path drops what the maze keeps between the runs (the
+        # junction graph of junctionSearch), every run builds it again
+        m.path = None
+        path = stats.run(solver, m, trace_memory=False)
+        times.append(stats.time_ns / 1e6)
+    # The memory is traced in a run of its own, tracemalloc slows it down
+    m.path = None
+    memory = SolverStats()
+    memory.run(solver, m)
+    stats.peak_memory = memory.peak_memory
+    return times, stats, len(path) + 1
+
+
+def run_job(size, loop_percent, algorithm, seed, solvers, warmup=1, repeat=5):
+    """
+    Generate one maze from its seed and time the solvers on it
+
+    Runs in the worker processes, only these arguments and the small
+    result go between the processes, never the maze.
+
+    Returns:
+        dict with the configuration, the generation time in ms (loops
+        included) and for every solver the timed runs in ms, the SolverStats
+        counters and the path length
+    """
+    m = maze(size, size, headless=True)
+    # Timed here, the generationTime of the maze leaves the loops out
+    start = time.perf_counter()
+    m.CreateMaze(loopPercent=loop_percent, algorithm=algorithm, seed=seed)
+    generate_ms = (time.perf_counter() - start) * 1000
+    samples = {}
+    for name in solvers:
+        times, stats, path_length = benchmark_solver(SOLVERS[name], m, warmup, repeat)
+        samples[name] = (times, stats.as_dict(), path_length)
+    return {
+        'size': size,
+        'loop_percent': loop_percent,
+        'algorithm': algorithm,
+        'seed': seed,
+        'generate_ms': generate_ms,
+        'samples': samples,
+    }
+
+
+def summarize(size, loop_percent, algorithm, name, jobs):
+    """
+    Result dict (see FIELDS) of one solver over the jobs of one configuration
+    """
+    times = [t for job in jobs for t in job['samples'][name][0]]
+    stats = [job['samples'][name][1] for job in jobs]
+    return {
+        'size': size,
+        'loop_percent': loop_percent,
+        'algorithm': algorithm,
+        'solver': name,
+        'runs': len(times),
+        'median_ms': statistics.median(times),
+        'p95_ms': percentile(times, 95),
+        'expanded': statistics.median(s['expanded'] for s in stats),
+        'pushed': statistics.median(s['pushed'] for s in stats),
+        'peak_frontier': max(s['peak_frontier'] for s in stats),
+        'peak_memory': max(s['peak_memory'] for s in stats),
+        'path_length': statistics.median(job['samples'][name][2] for job in jobs),
+        'generate_ms': statistics.median(job['generate_ms'] for job in jobs),
+    }
+
+
+def run_benchmark(sizes, loops, algorithms, seeds, solvers, warmup=1, repeat=5, workers=None, log=print):
+    """
+    Run the whole sweep
+
+    Every (size, loop percent, algorithm, seed) maze is a job of its own, the
+    jobs run on a pool of worker processes and are collected as they finish.
+    workers=1 runs them one after the other in this process.
+    Timings taken side by side on busy cores are noisier, compare results
+    taken with the same number of workers.
+
+    Returns:
+        list of result dicts (see FIELDS), one per configuration and solver
+    """
+    jobs = [(size, loop_percent, algorithm, seed)
+            for size in sizes for loop_percent in loops for algorithm in algorithms for seed in range(seeds)]
+    done = {}
+
+    def collect(job):
+        config = (job['size'], job['loop_percent'], job['algorithm'])
+        done.setdefault(config, []).append(job)
+        log(f"{sum(map(len, done.values())):>5}/{len(jobs)} {config[0]:>5}x{config[0]:<5} loops={config[1]:<3}"
+            f" {config[2]:<12} seed={job['seed']:<3} generated in {job['generate_ms']:.1f} ms")
+
+    if workers == 1:
+        for job in jobs:
+            collect(run_job(*job, solvers, warmup, repeat))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(run_job, *job, solvers, warmup, repeat) for job in jobs]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    results = []
+    for size in sizes:
+        for loop_percent in loops:
+            for algorithm in algorithms:
+                for name in solvers:
+                    result = summarize(size, loop_percent, algorithm, name, done[(size, loop_percent, algorithm)])
+                    results.append(result)
+                    log(f"{size:>5}x{size:<5} loops={loop_percent:<3} {algorithm:<12} {name:<16}"
+                        f" median={result['median_ms']:10.3f} ms  p95={result['p95_ms']:10.3f} ms"
+                        f"  expanded={result['expanded']:>9}  memory={result['peak_memory'] / 1024:9.1f} KiB")
+    return results
+
+
+def _key(result):
+    return (result['size'], result['loop_percent'], result['algorithm'], result['solver'])
+
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=1.0):
+    """
+    Compare results with a baseline
+
+    Args:
+        results (list): Results of run_benchmark
+        baseline (list): Results of an earlier run
+        tolerance (float): Allowed relative slowdown of the median time over
+            the baseline's p95 time
+        min_delta_ms (float): Allowed absolute slowdown of the median time.
+            A slowdown is only a regression beyond both, sub-millisecond
+            timings are mostly scheduling noise.
+
+    Returns:
+        list of regression messages (empty if there is none)
+    """
+    old = {_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = old.get(_key(result))
+        if before is None:
+            continue
+        name = '{}x{} loops={} {} {}'.format(result['size'], result['size'], *_key(result)[1:])
+        # Against the slow end of the baseline, one noisy run can't fail it
+        slowest = max(before['median_ms'], before.get('p95_ms', 0))
+        if (result['median_ms'] > slowest * (1 + tolerance)
+                and result['median_ms'] - before['median_ms'] > min_delta_ms):
+            regressions.append(f"{name}: median {before['median_ms']:.3f} ms -> {result['median_ms']:.3f} ms")
+        # The mazes come from the seeds, the same solver does the same work
+        if result['expanded'] > before['expanded']:
+            regressions.append(f"{name}: expanded {before['expanded']} -> {result['expanded']}")
+    return regressions
+
+
+def write_json(filename, results, args):
+    meta = {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': pyMaze.np.__version__ if pyMaze.np is not None else None,
+        'args': vars(args),
+    }
+    with open(filename, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+
+def write_csv(filename, results):
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless benchmark of the maze solvers')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='maze sizes (size x size)')
+    parser.add_argument('--loops', type=int, nargs='+', default=LOOPS, help='loop percentages')
+    parser.add_argument('--algorithms', nargs='+', default=['backtracker'],
+                        choices=sorted(pyMaze.GENERATORS), help='maze generators')
+    parser.add_argument('--solvers', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--seeds', type=int, default=3, help='mazes per configuration (seeds 0..n-1)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before timing')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per maze')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per CPU, 1: no pool)')
+    parser.add_argument('--json', help='write the results to this JSON file')
+    parser.add_argument('--csv', help='write the results to this CSV file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative slowdown of the median time over the baseline's p95 (default 0.2)")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='allowed absolute slowdown of the median time in ms (default 1)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.sizes, args.loops, args.algorithms, args.seeds, args.solvers,
+                            args.warmup, args.repeat, args.workers)
+    if args.json:
+        write_json(args.json, results, args)
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        if regressions:
+            return 1
+        print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
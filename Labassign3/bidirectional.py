@@ -0,0 +1,140 @@
+from pyMaze import maze,agent,COLOR,textLabel
+from heapq import heappush,heappop
+from array import array
+from bfs import moveTable,fwdPathFrom
+def joinPath(m,came,offsets,start,meet,goal):
+    # start-->meet from the search from start (came[0]) and meet-->goal
+    # from the search from goal (came[1])
+    cols=m.cols
+    t=(goal[0]-1)*cols+goal[1]-1
+    i=(meet[0]-1)*cols+meet[1]-1
+    fwdPath=fwdPathFrom(m,came[0],offsets,start,meet)
+    cell=meet
+    while i!=t:
+        i-=offsets[came[1][i]]
+        nextCell=(i//cols+1,i%cols+1)
+        fwdPath[cell]=nextCell
+        cell=nextCell
+    return fwdPath
+def biBFS(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    walls=m._openSides()
+    moves,offsets=moveTable(m)
+    n=len(walls)
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    came=(bytearray(n),bytearray(n))
+    came[0][s]=came[1][t]=5
+    dist=(array('i',[0])*n,array('i',[0])*n)
+    frontier=[[s],[t]]
+    meet=s if s==t else None
+    best=2*n
+    expanded=0
+    peak=2
+    while meet is None and frontier[0] and frontier[1]:
+        # The smaller frontier grows by a whole level, the meeting cells
+        # of that level are compared to keep the path the shortest
+        side=0 if len(frontier[0])<=len(frontier[1]) else 1
+        mine,other=came[side],came[1-side]
+        d,od=dist[side],dist[1-side]
+        nextFrontier=[]
+        level=d[frontier[side][0]]+1
+        for i in frontier[side]:
+            for dd,o in moves[walls[i]]:
+                j=i+o
+                if not mine[j]:
+                    mine[j]=dd
+                    d[j]=level
+                    nextFrontier.append(j)
+                    if other[j] and level+od[j]<best:
+                        best=level+od[j]
+                        meet=j
+        expanded+=len(frontier[side])
+        frontier[side]=nextFrontier
+        peak=max(peak,len(frontier[0])+len(frontier[1]))
+    if stats is not None:
+        stats.pushed=2*n-came[0].count(0)-came[1].count(0)
+        stats.expanded=expanded
+        stats.peak_frontier=peak
+    if meet is None:
+        raise KeyError(goal)
+    return joinPath(m,came,offsets,start,(meet//cols+1,meet%cols+1),goal)
+def biAStar(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    walls=m._openSides()
+    moves,offsets=moveTable(m)
+    n=len(walls)
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    if s==t:
+        return {}
+    target=((t//cols,t%cols),(s//cols,s%cols))
+    def p(i):
+        # Twice the balanced heuristic (h to goal-h to start)/2 of the side
+        # from start, the side from goal uses -p. Both are consistent, so a
+        # side can stop once the smallest keys add up to the best length.
+        x,y=i//cols,i%cols
+        return abs(x-target[0][0])+abs(y-target[0][1])-abs(x-target[1][0])-abs(y-target[1][1])
+    g_score=(array('i',[n])*n,array('i',[n])*n)
+    g_score[0][s]=g_score[1][t]=0
+    closed=(bytearray(n),bytearray(n))
+    came=(bytearray(n),bytearray(n))
+    came[0][s]=came[1][t]=5
+    open=([(p(s),s)],[(-p(t),t)])
+    best=n
+    meet=None
+    expanded=0
+    pushed=2
+    track=stats is not None
+    peak=2
+    while open[0] and open[1]:
+        # Keys are 2g+p and 2g-p, no path through the open cells can be
+        # shorter than best any more
+        if open[0][0][0]+open[1][0][0]>=2*best:
+            break
+        side=0 if open[0][0][0]<=open[1][0][0] else 1
+        currCell=heappop(open[side])[1]
+        if closed[side][currCell]:
+            continue
+        closed[side][currCell]=1
+        expanded+=1
+        g,og=g_score[side],g_score[1-side]
+        sign=1-2*side
+        temp_g_score=g[currCell]+1
+        for d,o in moves[walls[currCell]]:
+            childCell=currCell+o
+            if temp_g_score<g[childCell]:
+                g[childCell]=temp_g_score
+                came[side][childCell]=d
+                heappush(open[side],(2*temp_g_score+sign*p(childCell),childCell))
+                pushed+=1
+                if temp_g_score+og[childCell]<best:
+                    best=temp_g_score+og[childCell]
+                    meet=childCell
+        if track and len(open[0])+len(open[1])>peak:
+            peak=len(open[0])+len(open[1])
+    if track:
+        stats.expanded=expanded
+        stats.pushed=pushed
+        stats.peak_frontier=peak
+    if meet is None:
+        raise KeyError(goal)
+    return joinPath(m,came,offsets,start,(meet//cols+1,meet%cols+1),goal)
+
+if __name__=='__main__':
+    m=maze(20,30)
+    m.CreateMaze(loopPercent=100)
+    path1=biBFS(m)
+    path2=biAStar(m)
+
+    a=agent(m,footprints=True,filled=True)
+    b=agent(m,footprints=True,color=COLOR.red)
+    m.tracePath({a:path1,b:path2})
+    l=textLabel(m,'Bidirectional BFS Path Length',len(path1)+1)
+    l=textLabel(m,'Bidirectional A* Path Length',len(path2)+1)
+
+    m.run()
@@ -1,35 +1,31 @@
 from pyMaze import maze,agent,COLOR
-def DFS(m):
-    start=(m.rows,m.cols)
-    explored=[start]
-    frontier=[start]
-    dfsPath={}
-    while len(frontier)>0:
-        currCell=frontier.pop()
-        if currCell==(1,1):
+from bfs import moveTable,fwdPathFrom,setStats
+def DFS(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    walls=m._openSides()
+    moves,offsets=moveTable(m)
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    came=bytearray(len(walls))
+    came[s]=5
+    frontier=[s]
+    track=stats is not None
+    peak=1
+    while frontier:
+        i=frontier.pop()
+        if i==t:
             break
-        for d in 'ESNW':
-            if m.maze_map[currCell][d]==True:
-                if d=='E':
-                    childCell=(currCell[0],currCell[1]+1)
-                elif d=='W':
-                    childCell=(currCell[0],currCell[1]-1)
-                elif d=='S':
-                    childCell=(currCell[0]+1,currCell[1])
-                elif d=='N':
-                    childCell=(currCell[0]-1,currCell[1])
-                if childCell in explored:
-                    continue
-                explored.append(childCell)
-                frontier.append(childCell)
-                dfsPath[childCell]=currCell
-    fwdPath={}
-    cell=(1,1)
-    while cell!=start:
-        fwdPath[dfsPath[cell]]=cell
-        cell=dfsPath[cell]
-    return fwdPath
-
+        for d,o in moves[walls[i]]:
+            if not came[i+o]:
+                came[i+o]=d
+                frontier.append(i+o)
+        if track and len(frontier)>peak:
+            peak=len(frontier)
+    if track:
+        setStats(stats,came,frontier,peak)
+    return fwdPathFrom(m,came,offsets,start,goal)
 
 if __name__=='__main__':
     m=maze(15,10)
@@ -0,0 +1,167 @@
+from pyMaze import maze,agent,COLOR,textLabel,_E,_W,_N,_S
+from heapq import heappush,heappop
+from array import array
+_OPPOSITE={'E':'W','W':'E','N':'S','S':'N'}
+class DStarLite:
+    # Incremental planner (D* Lite) bound to a maze.
+    # It searches from goal to start and keeps its g/rhs values between the
+    # plans, so after a wall change only the cells whose distance to the
+    # goal changed are expanded again. The start can move too (moveStart).
+    #   p=DStarLite(m)
+    #   path=p.path()
+    #   p.setWall((5,5),'E',False)
+    #   path=p.path()
+    def __init__(self,m,start=None,goal=(1,1)):
+        if start is None:
+            start=(m.rows,m.cols)
+        self.m=m
+        self.cols=m.cols
+        n=m.rows*m.cols
+        self._inf=n+1
+        self.g=array('i',[self._inf])*n
+        self.rhs=array('i',[self._inf])*n
+        self.s=self._index(start)
+        self.t=self._index(goal)
+        self._last=self.s
+        self._km=0
+        self._open=[]
+        self._queued={}
+        # The work done since the last plan, wall changes included
+        self._expanded=self._pushed=self._peak=0
+        self.expanded=self.pushed=0
+        self.rhs[self.t]=0
+        self._push(self.t)
+    def _index(self,cell):
+        x,y=cell
+        if not (0<x<=self.m.rows and 0<y<=self.cols):
+            raise ValueError(f'{cell} is not a cell of the maze')
+        return (x-1)*self.cols+y-1
+    def _neighbours(self,i):
+        # The walls are read live, so the changes are seen right away
+        v=self.m._walls[i]
+        cols=self.cols
+        c=i%cols
+        if v&_E and c+1<cols: yield i+1
+        if v&_S and i+cols<len(self.g): yield i+cols
+        if v&_N and i>=cols: yield i-cols
+        if v&_W and c: yield i-1
+    def _h(self,i):
+        s=self.s
+        return abs(i//self.cols-s//self.cols)+abs(i%self.cols-s%self.cols)
+    def _key(self,i):
+        k=min(self.g[i],self.rhs[i])
+        return (k+self._h(i)+self._km,k)
+    def _push(self,i):
+        key=self._key(i)
+        self._queued[i]=key
+        heappush(self._open,(key,i))
+        self._pushed+=1
+        if len(self._open)>self._peak:
+            self._peak=len(self._open)
+    def _update(self,i):
+        g,rhs=self.g,self.rhs
+        if i!=self.t:
+            rhs[i]=min(min((g[j] for j in self._neighbours(i)),default=self._inf)+1,self._inf)
+        if g[i]!=rhs[i]:
+            self._push(i)
+        else:
+            self._queued.pop(i,None)
+    def _computeShortestPath(self):
+        g,rhs=self.g,self.rhs
+        open,queued=self._open,self._queued
+        s=self.s
+        while open:
+            key,i=open[0]
+            if queued.get(i)!=key:
+                # A stale entry, the cell was queued again or is consistent
+                heappop(open)
+                continue
+            if key>=self._key(s) and rhs[s]==g[s]:
+                break
+            heappop(open)
+            newKey=self._key(i)
+            if key<newKey:
+                self._push(i)
+                continue
+            del queued[i]
+            self._expanded+=1
+            if g[i]>rhs[i]:
+                g[i]=rhs[i]
+            else:
+                g[i]=self._inf
+                self._update(i)
+            for j in self._neighbours(i):
+                self._update(j)
+    def path(self,stats=None):
+        # The shortest path from start to goal as fwdPath, replanned only
+        # as far as the changes since the last plan require
+        self._computeShortestPath()
+        self.expanded,self.pushed=self._expanded,self._pushed
+        if stats is not None:
+            stats.expanded=self.expanded
+            stats.pushed=self.pushed
+            stats.peak_frontier=self._peak
+        self._expanded=self._pushed=0
+        self._peak=len(self._open)
+        if self.g[self.s]>=self._inf:
+            raise KeyError((self.t//self.cols+1,self.t%self.cols+1))
+        g=self.g
+        cols=self.cols
+        fwdPath={}
+        i=self.s
+        while i!=self.t:
+            if len(fwdPath)>=self._inf:
+                # Only with g values that are not consistent, never loop
+                raise RuntimeError('D* Lite path extraction did not reach the goal')
+            j=min(self._neighbours(i),key=g.__getitem__)
+            fwdPath[(i//cols+1,i%cols+1)]=(j//cols+1,j%cols+1)
+            i=j
+        return fwdPath
+    def moveStart(self,cell):
+        # The agent moved, the heuristic now aims at the new start. The keys
+        # already queued are kept lower bounds by raising _km by as much as
+        # the heuristic can have dropped.
+        self.s=self._index(cell)
+        self._km+=self._h(self._last)
+        self._last=self.s
+    def wallsChanged(self,cells):
+        # To tell the planner the walls of these cells were changed (through
+        # maze_map, which also drops the path and distances the maze kept)
+        self._km+=self._h(self._last)
+        self._last=self.s
+        for cell in cells:
+            self._update(self._index(cell))
+    def setWall(self,cell,d,isOpen):
+        # To open (isOpen=True) or close the wall on side d ('E','W','N','S')
+        # of cell, on both cells it separates
+        x,y=cell
+        other={'E':(x,y+1),'W':(x,y-1),'N':(x-1,y),'S':(x+1,y)}[d]
+        self._index(other)
+        self.m.maze_map[cell][d]=isOpen
+        self.m.maze_map[other][_OPPOSITE[d]]=isOpen
+        self.wallsChanged([cell,other])
+
+if __name__=='__main__':
+    m=maze(20,20)
+    m.CreateMaze(loopPercent=20)
+    planner=DStarLite(m)
+    path1=planner.path()
+    first=planner.expanded
+    # Closing a wall on the path, one that leaves another way around
+    for cell,nextCell in list(path1.items())[len(path1)//2:]:
+        d='E' if nextCell[1]>cell[1] else 'W' if nextCell[1]<cell[1] else 'S' if nextCell[0]>cell[0] else 'N'
+        planner.setWall(cell,d,False)
+        try:
+            path2=planner.path()
+            break
+        except KeyError:
+            planner.setWall(cell,d,True)
+    else:
+        path2=planner.path()
+
+    a=agent(m,footprints=True,color=COLOR.red)
+    m.tracePath({a:path2})
+    l=textLabel(m,'Cells Expanded First',first)
+    l=textLabel(m,'Cells Expanded Replanning',planner.expanded)
+
+    m.run()
@@ -0,0 +1,127 @@
+from pyMaze import maze,agent,COLOR,textLabel,_E,_W,_N,_S
+from array import array
+from bfs import moveTable
+def deepen(m,start,goal,h,tableSize=0,stats=None):
+    # Depth-first searches again and again with a growing bound on
+    # g+h(cell). Only the route to the current cell is kept (two bytes
+    # and a set entry per cell on it), so the memory is O(path depth) and not
+    # O(cells) like the explored/came tables of the other solvers, at the
+    # price of searching the cells near start again in every round.
+    # h(cell index)--> a lower bound of the distance to goal, 0 for IDDFS
+    # tableSize--> at most this many cells remember the lowest g they were
+    #   reached with in the round, to cut the searches that reach a cell
+    #   again by another route. 0 for no table. Without it the loops of a
+    #   maze are searched over and over, the more loops the slower.
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    walls=m._walls
+    moves,offsets=moveTable(m)
+    back=(0,_W,_N,_S,_E)
+    last=len(walls)-cols
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    def openSides(i,d):
+        # The open sides of the cell, without the ones leading out of the
+        # maze and the one back to where it was entered from (direction d)
+        v=walls[i]&~back[d]
+        if i<cols: v&=~_N
+        if i>=last: v&=~_S
+        c=i%cols
+        if not c: v&=~_W
+        if c==cols-1: v&=~_E
+        return v
+    bound=h(s)
+    expanded=0
+    pushed=0
+    peak=1
+    found=s==t
+    while not found:
+        # One entry per cell on the route: the cell, its sides still to be
+        # tried and the next one of them. onRoute keeps the route free of
+        # loops, so a round the bound cut nowhere has searched every cell
+        # reachable from start.
+        route=array('i',[s])
+        onRoute={s}
+        sides=bytearray([openSides(s,0)])
+        tried=bytearray(1)
+        table={}
+        nextBound=None
+        pushed+=1
+        expanded+=1
+        while route:
+            mv=moves[sides[-1]]
+            k=tried[-1]
+            if k==len(mv):
+                onRoute.discard(route.pop())
+                sides.pop()
+                tried.pop()
+                continue
+            tried[-1]=k+1
+            d,o=mv[k]
+            child=route[-1]+o
+            if child in onRoute:
+                continue
+            g=len(route)
+            f=g+h(child)
+            if f>bound:
+                if nextBound is None or f<nextBound:
+                    nextBound=f
+                continue
+            if tableSize:
+                if table.get(child,g+1)<=g:
+                    continue
+                if child in table or len(table)<tableSize:
+                    table[child]=g
+            route.append(child)
+            onRoute.add(child)
+            pushed+=1
+            if g>=peak:
+                peak=g+1
+            if child==t:
+                found=True
+                break
+            sides.append(openSides(child,d))
+            tried.append(0)
+            expanded+=1
+        if found or nextBound is None:
+            break
+        bound=nextBound
+    if stats is not None:
+        # Summed over all the rounds, the frontier is the route
+        stats.expanded=expanded
+        stats.pushed=pushed
+        stats.peak_frontier=peak
+    if s==t:
+        return {}
+    if not found:
+        raise KeyError(goal)
+    fwdPath={}
+    cell=start
+    for i in route[1:]:
+        nextCell=(i//cols+1,i%cols+1)
+        fwdPath[cell]=nextCell
+        cell=nextCell
+    return fwdPath
+def idaStar(m,start=None,goal=(1,1),stats=None,tableSize=0):
+    gx,gy=goal[0]-1,goal[1]-1
+    cols=m.cols
+    def h(i):
+        return abs(i//cols-gx)+abs(i%cols-gy)
+    return deepen(m,start,goal,h,tableSize,stats)
+def IDDFS(m,start=None,goal=(1,1),stats=None,tableSize=0):
+    return deepen(m,start,goal,lambda i:0,tableSize,stats)
+
+if __name__=='__main__':
+    m=maze(20,20)
+    m.CreateMaze(loopPercent=10)
+    path=idaStar(m,tableSize=256)
+    path2=IDDFS(m,tableSize=256)
+
+    a=agent(m,footprints=True)
+    b=agent(m,footprints=True,color=COLOR.red,filled=True)
+    m.tracePath({a:path,b:path2})
+    l=textLabel(m,'IDA* Path Length',len(path)+1)
+    l=textLabel(m,'IDDFS Path Length',len(path2)+1)
+
+    m.run()
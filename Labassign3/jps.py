@@ -0,0 +1,119 @@
+from pyMaze import maze,agent,COLOR,textLabel,_E,_W,_N,_S
+from heapq import heappush,heappop
+from astar import aStar
+from solverstats import SolverStats
+# Jump Point Search on the wall grid (4 directions).
+# Of the shortest paths, the ones making their vertical moves as early as
+# possible are searched: going E/W a path only turns N/S at a cell where it
+# could not have turned one cell earlier (a forced turn), going N/S it can
+# turn E/W anywhere. The cells where the search has to decide are the jump
+# points, the straight runs between them never go on the heap.
+def jumpPointSearch(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    cols=m.cols
+    sides=m._openSides()
+    step={_E:1,_W:-1,_N:-cols,_S:cols}
+    s=(start[0]-1)*cols+start[1]-1
+    t=(goal[0]-1)*cols+goal[1]-1
+    gx,gy=goal[0]-1,goal[1]-1
+    def forced(c,d):
+        # The N/S sides of c (reached going d) a path has to turn to at c
+        p=c-step[d]
+        return [v for v in (_N,_S) if sides[c]&v and not (sides[p]&v and sides[p+step[v]]&d)]
+    def jumpHorizontal(c,d):
+        while sides[c]&d:
+            c+=step[d]
+            if c==t or forced(c,d):
+                return c
+        return None
+    def jumpVertical(c,d):
+        while sides[c]&d:
+            c+=step[d]
+            if c==t:
+                return c
+            for h in (_E,_W):
+                if sides[c]&h and jumpHorizontal(c,h) is not None:
+                    return c
+        return None
+    def successors(c,d):
+        # The directions to jump in from c, reached going d
+        if d is None:
+            return (_E,_W,_N,_S)
+        if d in (_E,_W):
+            return [d]+forced(c,d)
+        return (d,_E,_W)
+    g_score={s:0}
+    came={s:(s,None)}
+    closed=set()
+    expanded=0
+    pushed=1
+    track=stats is not None
+    peak=1
+    open=[(0,s)]
+    while open:
+        currCell=heappop(open)[1]
+        if currCell in closed:
+            continue
+        closed.add(currCell)
+        expanded+=1
+        if currCell==t:
+            break
+        d=came[currCell][1]
+        for nd in successors(currCell,d):
+            if not sides[currCell]&nd:
+                continue
+            if nd in (_E,_W):
+                j=jumpHorizontal(currCell,nd)
+            else:
+                j=jumpVertical(currCell,nd)
+            if j is None:
+                continue
+            score=g_score[currCell]+abs(j-currCell)//(1 if nd in (_E,_W) else cols)
+            if score<g_score.get(j,len(sides)):
+                g_score[j]=score
+                came[j]=(currCell,nd)
+                heappush(open,(score+abs(j//cols-gx)+abs(j%cols-gy),j))
+                pushed+=1
+        if track and len(open)>peak:
+            peak=len(open)
+    if track:
+        stats.expanded=expanded
+        stats.pushed=pushed
+        stats.peak_frontier=peak
+    if t not in came:
+        raise KeyError(goal)
+    # The jump points are on straight lines, the cells between them are
+    # filled in
+    jumps=[]
+    i=t
+    while i!=s:
+        prev,d=came[i]
+        jumps.append((prev,d,i))
+        i=prev
+    fwdPath={}
+    for prev,d,i in reversed(jumps):
+        while prev!=i:
+            fwdPath[(prev//cols+1,prev%cols+1)]=((prev+step[d])//cols+1,(prev+step[d])%cols+1)
+            prev+=step[d]
+    return fwdPath
+def compareExpansions(m,start=None,goal=(1,1)):
+    # Number of cells taken off the heap by aStar and by jumpPointSearch
+    a,j=SolverStats(),SolverStats()
+    aStar(m,start,goal,stats=a)
+    jumpPointSearch(m,start,goal,stats=j)
+    return {'aStar':a.expanded,'jumpPointSearch':j.expanded}
+
+if __name__=='__main__':
+    m=maze(30,30)
+    m.CreateMaze(loopPercent=100)
+    path=jumpPointSearch(m)
+    counts=compareExpansions(m)
+
+    a=agent(m,footprints=True,color=COLOR.red)
+    m.tracePath({a:path})
+    l=textLabel(m,'JPS Path Length',len(path)+1)
+    l=textLabel(m,'A* Expansions',counts['aStar'])
+    l=textLabel(m,'JPS Expansions',counts['jumpPointSearch'])
+
+    m.run()
@@ -0,0 +1,85 @@
+from pyMaze import maze,agent,textLabel
+from heapq import heappush,heappop
+def junctionSearch(m,start=None,goal=(1,1),stats=None):
+    if start is None:
+        start=(m.rows,m.cols)
+    g=m.junctions
+    s=g.index(start)
+    t=g.index(goal)
+    if s==t:
+        return {}
+    def h(i):
+        return abs(i//g.cols-t//g.cols)+abs(i%g.cols-t%g.cols)
+    # start and goal can be inside a corridor, they are joined to the
+    # nodes at both ends of it
+    if g.isNode[s]:
+        startEdges=g.edges[s]
+    else:
+        startEdges=[g.walk(s,side,t)[:2]+(side,) for side in g.openSides(s)]
+    toGoal={}
+    if not g.isNode[t]:
+        for side in g.openSides(t):
+            j,n,back=g.walk(t,side,s)
+            # A start inside the corridor already reaches goal by its own
+            # walks, a start at a junction walks past goal by its edges
+            if (j!=s or g.isNode[s]) and (j not in toGoal or n<toGoal[j][1]):
+                toGoal[j]=(t,n,back)
+    g_score={s:0}
+    parent={}
+    open=[(h(s),s)]
+    expanded=0
+    pushed=1
+    track=stats is not None
+    peak=1
+    while open:
+        f,curr=heappop(open)
+        if f-h(curr)>g_score[curr]:
+            continue
+        expanded+=1
+        if curr==t:
+            break
+        edges=startEdges if curr==s else g.edges.get(curr,())
+        if curr in toGoal:
+            edges=list(edges)+[toGoal[curr]]
+        for child,n,side in edges:
+            score=g_score[curr]+n
+            if score<g_score.get(child,float('inf')):
+                g_score[child]=score
+                parent[child]=(curr,side,n)
+                heappush(open,(score+h(child),child))
+                pushed+=1
+        if track and len(open)>peak:
+            peak=len(open)
+    if track:
+        # Counted in junctions, not cells
+        stats.expanded=expanded
+        stats.pushed=pushed
+        stats.peak_frontier=peak
+    if t not in parent:
+        raise KeyError(goal)
+    # Expanding the corridors back into cells
+    route=[]
+    node=t
+    while node!=s:
+        prev,side,n=parent[node]
+        route.append((prev,side,n))
+        node=prev
+    fwdPath={}
+    cell=start
+    for prev,side,n in reversed(route):
+        for nextCell in g.cells(prev,side,n):
+            fwdPath[cell]=nextCell
+            cell=nextCell
+    return fwdPath
+
+if __name__=='__main__':
+    m=maze(20,20)
+    m.CreateMaze(loopPercent=10)
+    path=junctionSearch(m)
+
+    a=agent(m,footprints=True)
+    m.tracePath({a:path})
+    l=textLabel(m,'Junctions',len(m.junctions))
+    l=textLabel(m,'Path Length',len(path)+1)
+
+    m.run()
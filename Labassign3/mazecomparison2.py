@@ -1,10 +1,11 @@
 from pyMaze import maze, agent, COLOR, textLabel
 from bfs import BFS
 from dfs import DFS
-import time
+from solverstats import SolverStats
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 class MazeComparison:
-    def __init__(self, rows, cols, loop_percent=20):
+    def __init__(self, rows, cols, loop_percent=20, seed=None, headless=False):
         """
         Initialize maze comparison with given dimensions
         
@@ -12,17 +13,21 @@ class MazeComparison:
             rows (int): Number of rows in maze
             cols (int): Number of columns in maze
             loop_percent (int): Percentage of loops in maze (0-100)
+            seed (int): Seed of the maze, the same seed gives the same maze
+            headless (bool): Create the maze without a window (no visualize)
         """
         self.rows = rows
         self.cols = cols
         self.loop_percent = loop_percent
+        self.seed = seed
+        self.headless = headless
         self.maze = None
         self.results = {}
 
     def create_maze(self):
         """Create a new maze with specified dimensions"""
-        self.maze = maze(self.rows, self.cols)
-        self.maze.CreateMaze(loopPercent=self.loop_percent)
+        self.maze = maze(self.rows, self.cols, headless=self.headless)
+        self.maze.CreateMaze(loopPercent=self.loop_percent, seed=self.seed)
         return self.maze
 
     def solve_maze(self):
@@ -33,34 +38,38 @@ class MazeComparison:
         if not self.maze:
             self.create_maze()
 
-        # BFS solution
-        bfs_start_time = time.time()
-        bfs_path = BFS(self.maze)
-        bfs_time = time.time() - bfs_start_time
-        bfs_explored = len(set(bfs_path.keys()) | set(bfs_path.values()))
-
-        # DFS solution
-        dfs_start_time = time.time()
-        dfs_path = DFS(self.maze)
-        dfs_time = time.time() - dfs_start_time
-        dfs_explored = len(set(dfs_path.keys()) | set(dfs_path.values()))
-
         self.results = {
-            'bfs': {
-                'path': bfs_path,
-                'explored_cells': bfs_explored,
-                'path_length': len(bfs_path) + 1,
-                'time': bfs_time
-            },
-            'dfs': {
-                'path': dfs_path,
-                'explored_cells': dfs_explored,
-                'path_length': len(dfs_path) + 1,
-                'time': dfs_time
-            }
+            'bfs': self._solve(BFS),
+            'dfs': self._solve(DFS)
         }
         return self.results
 
+    def _solve(self, solver):
+        """
+        Solve the maze with one solver and measure the work it did
+
+        Args:
+            solver (callable): The solver, e.g. BFS
+
+        Returns:
+            dict with the path and the SolverStats counters
+        """
+        # tracemalloc slows the solver down, so the time and the memory
+        # are measured in two runs
+        stats = SolverStats()
+        path = stats.run(solver, self.maze, trace_memory=False)
+        memory = SolverStats()
+        memory.run(solver, self.maze)
+        return {
+            'path': path,
+            'explored_cells': stats.expanded,
+            'pushed_cells': stats.pushed,
+            'peak_frontier': stats.peak_frontier,
+            'peak_memory': memory.peak_memory,
+            'path_length': len(path) + 1,
+            'time': stats.time_ns / 1e9
+        }
+
     def visualize(self, delay=300):
         """
         Visualize both BFS and DFS paths on the maze
@@ -80,63 +89,96 @@ class MazeComparison:
         self.maze.tracePath({dfs_agent: self.results['dfs']['path']}, delay=delay)
 
         # Add metrics labels
-        textLabel(self.maze, 'BFS Path Length', self.results['bfs']['path_length'])
-        textLabel(self.maze, 'BFS Cells Explored', self.results['bfs']['explored_cells'])
-        textLabel(self.maze, 'BFS Time (s)', f"{self.results['bfs']['time']:.3f}")
-        
-        textLabel(self.maze, 'DFS Path Length', self.results['dfs']['path_length'])
-        textLabel(self.maze, 'DFS Cells Explored', self.results['dfs']['explored_cells'])
-        textLabel(self.maze, 'DFS Time (s)', f"{self.results['dfs']['time']:.3f}")
+        for name in ('bfs', 'dfs'):
+            results = self.results[name]
+            label = name.upper()
+            textLabel(self.maze, f'{label} Path Length', results['path_length'])
+            textLabel(self.maze, f'{label} Cells Explored', results['explored_cells'])
+            textLabel(self.maze, f'{label} Peak Frontier', results['peak_frontier'])
+            textLabel(self.maze, f'{label} Peak Memory (KiB)', f"{results['peak_memory'] / 1024:.1f}")
+            textLabel(self.maze, f'{label} Time (ms)', f"{results['time'] * 1000:.3f}")
 
         # Run visualization
         self.maze.run()
 
-def run_comparison_tests(test_sizes=None):
+def compare_job(rows, cols, loop_percent, seed):
+    """
+    Solve one seeded maze without a window
+
+    Runs in the worker processes: the maze is generated there from its
+    seed, only the numbers come back.
+
+    Returns:
+        dict with the BFS and DFS results, without the paths
+    """
+    results = MazeComparison(rows, cols, loop_percent, seed=seed, headless=True).solve_maze()
+    for result in results.values():
+        del result['path']
+    return results
+
+def print_results(size, seed, results):
+    """Print the results of one comparison"""
+    print(f"\nMaze Size: {size[0]}x{size[1]} (seed {seed})")
+    print("-" * 30)
+
+    for name in ('bfs', 'dfs'):
+        print(f"{name.upper()} Results:")
+        print(f"  - Cells Explored: {results[name]['explored_cells']}")
+        print(f"  - Cells Pushed: {results[name]['pushed_cells']}")
+        print(f"  - Peak Frontier: {results[name]['peak_frontier']}")
+        print(f"  - Peak Memory: {results[name]['peak_memory'] / 1024:.1f} KiB")
+        print(f"  - Path Length: {results[name]['path_length']}")
+        print(f"  - Time: {results[name]['time'] * 1000:.3f} ms")
+
+    # Calculate efficiency metrics
+    bfs_efficiency = results['bfs']['path_length'] / results['bfs']['explored_cells']
+    dfs_efficiency = results['dfs']['path_length'] / results['dfs']['explored_cells']
+    print("\nEfficiency (Path Length / Cells Explored):")
+    print(f"  - BFS: {bfs_efficiency:.3f}")
+    print(f"  - DFS: {dfs_efficiency:.3f}")
+
+def run_comparison_tests(test_sizes=None, seeds=(0,), loop_percent=20, workers=None, visualize=True):
     """
     Run comparison tests for different maze sizes
+
+    Every (size, seed) comparison is a job of its own. The jobs run on a pool
+    of worker processes and are printed as they finish, the mazes are then
+    visualized one by one in this process (regenerated from their seeds).
     
     Args:
         test_sizes (list): List of tuples containing (rows, cols) for different maze sizes
+        seeds (list): Seeds of the mazes of every size
+        loop_percent (int): Percentage of loops in the mazes (0-100)
+        workers (int): Number of worker processes (default one per CPU, 1 runs
+            the jobs in this process)
+        visualize (bool): Show every maze with its paths afterwards
     """
     if test_sizes is None:
         test_sizes = [(5,5), (10,10), (15,15)]
+    jobs = [(size, seed) for size in test_sizes for seed in seeds]
 
     print("\nMaze Solver Comparison Results:")
     print("-" * 60)
 
-    for size in test_sizes:
-        print(f"\nMaze Size: {size[0]}x{size[1]}")
-        print("-" * 30)
-        
+    def report(size, seed, solve):
         try:
-            comparison = MazeComparison(*size)
-            results = comparison.solve_maze()
-
-            # Print BFS results
-            print("BFS Results:")
-            print(f"  - Cells Explored: {results['bfs']['explored_cells']}")
-            print(f"  - Path Length: {results['bfs']['path_length']}")
-            print(f"  - Time: {results['bfs']['time']:.3f} seconds")
-
-            # Print DFS results
-            print("DFS Results:")
-            print(f"  - Cells Explored: {results['dfs']['explored_cells']}")
-            print(f"  - Path Length: {results['dfs']['path_length']}")
-            print(f"  - Time: {results['dfs']['time']:.3f} seconds")
-
-            # Calculate efficiency metrics
-            bfs_efficiency = results['bfs']['path_length'] / results['bfs']['explored_cells']
-            dfs_efficiency = results['dfs']['path_length'] / results['dfs']['explored_cells']
-            print("\nEfficiency (Path Length / Cells Explored):")
-            print(f"  - BFS: {bfs_efficiency:.3f}")
-            print(f"  - DFS: {dfs_efficiency:.3f}")
-
-            # Visualize the paths
-            comparison.visualize()
-
+            print_results(size, seed, solve())
         except Exception as e:
             print(f"Error running comparison for size {size}: {str(e)}")
 
+    if workers == 1:
+        for size, seed in jobs:
+            report(size, seed, lambda: compare_job(*size, loop_percent, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(compare_job, *size, loop_percent, seed): (size, seed) for size, seed in jobs}
+            for future in as_completed(futures):
+                report(*futures[future], future.result)
+
+    if visualize:
+        for size, seed in jobs:
+            MazeComparison(*size, loop_percent, seed=seed).visualize()
+
 if __name__ == '__main__':
     # Run tests with different maze sizes
     test_sizes = [
@@ -22,10 +22,22 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import random,datetime,csv,os
-from tkinter import *
+import random,datetime,csv,os,mmap,struct,time,hashlib
 from enum import Enum
-from collections import deque
+from collections import deque,OrderedDict
+from array import array
+try:
+    import numpy as np
+except ImportError:
+    np=None # loops are then added cell by cell
+
+def _tk():
+    '''
+    tkinter is imported only when a window is really created, so that
+    headless mazes can be used on machines without a display.
+    '''
+    import tkinter
+    return tkinter
 
 class COLOR(Enum):
     '''
@@ -46,6 +58,117 @@ class COLOR(Enum):
     blue=('DeepSkyBlue4','DeepSkyBlue2')
     yellow=('yellow2','yellow2')
 
+# Wall bits of a cell in the packed wall grid of the maze.
+# A set bit means that side of the cell is open.
+_E,_W,_N,_S=1,2,4,8
+_BITS={'E':_E,'W':_W,'N':_N,'S':_S}
+_OPPOSITE={_E:_W,_W:_E,_N:_S,_S:_N}
+_DEGREE=bytes(bin(v).count('1') for v in range(256)) # open sides of a cell
+
+# Mazes with more cells are drawn as a single image (see maze.rasterize)
+_RASTER_CELLS=200*200
+
+# Viewport (see maze.viewport): cells per side of a tile, number of tiles
+# kept drawn and the smallest starting cell width
+_TILE=32
+_MAX_TILES=64
+_VIEWPORT_WIDTH=12
+
+# Thinner frontiers of maze.wavefront are expanded cell by cell
+_WAVEFRONT_SMALL=256
+
+# Binary .maze file: header followed by the packed wall grid (one byte per cell)
+_MAGIC=b'PYMZ'
+_VERSION=1
+_HEADER=struct.Struct('<4sB3xIIIIq') # magic,version,rows,cols,goal x,goal y,seed(-1 if unknown)
+
+def _isBinaryMaze(filename):
+    '''
+    To check if a maze file is in the binary .maze format (otherwise CSV)
+    '''
+    with open(filename,'rb') as f:
+        return f.read(len(_MAGIC))==_MAGIC
+
+class _CellMap:
+    '''
+    Read-through view of the walls of one cell.
+    It behaves like the old {'E','W','N','S'} dictionary of maze_map but
+    reads and writes the bits of the packed wall grid of the maze.
+    '''
+    __slots__=('_maze','_i')
+    def __init__(self,parentMaze,i):
+        self._maze=parentMaze
+        self._i=i
+    def __getitem__(self,d):
+        return 1 if self._maze._walls[self._i]&_BITS[d] else 0
+    def __setitem__(self,d,v):
+        if v:
+            self._maze._walls[self._i]|=_BITS[d]
+        else:
+            self._maze._walls[self._i]&=~_BITS[d]
+        self._maze.path=None
+    def __iter__(self):
+        return iter(_BITS)
+    def __len__(self):
+        return 4
+    def keys(self):
+        return _BITS.keys()
+    def values(self):
+        return [self[d] for d in _BITS]
+    def items(self):
+        return [(d,self[d]) for d in _BITS]
+    def __eq__(self,other):
+        try:
+            return dict(self.items())==dict(other.items())
+        except AttributeError:
+            return NotImplemented
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+class _MazeMap:
+    '''
+    Read-through view of the packed wall grid with the old maze_map interface.
+    maze_map[cell] gives a _CellMap and maze_map[cell]={'E':..,'W':..,'N':..,'S':..}
+    sets all four walls of the cell at once.
+    '''
+    __slots__=('_maze',)
+    def __init__(self,parentMaze):
+        self._maze=parentMaze
+    def _index(self,cell):
+        x,y=cell
+        if 0<x<=self._maze.rows and 0<y<=self._maze.cols:
+            return (x-1)*self._maze.cols+y-1
+        raise KeyError(cell)
+    def __getitem__(self,cell):
+        return _CellMap(self._maze,self._index(cell))
+    def __setitem__(self,cell,walls):
+        v=0
+        for d,b in _BITS.items():
+            if walls[d]:
+                v|=b
+        self._maze._walls[self._index(cell)]=v
+        self._maze.path=None
+    def __contains__(self,cell):
+        try:
+            self._index(cell)
+        except (KeyError,TypeError,ValueError):
+            return False
+        return True
+    def __len__(self):
+        return self._maze.rows*self._maze.cols
+    def __iter__(self):
+        return iter(self._maze.grid)
+    def keys(self):
+        return self._maze.grid
+    def values(self):
+        return [self[cell] for cell in self._maze.grid]
+    def items(self):
+        return [(cell,self[cell]) for cell in self._maze.grid]
+    def get(self,cell,default=None):
+        if cell in self:
+            return self[cell]
+        return default
+
 class agent:
     '''
     The agents can be placed on the maze.
@@ -111,6 +234,11 @@ class agent:
     @y.setter
     def y(self,newY):
         self._y=newY
+        if self._parentMaze.headless:
+            return
+        if self._parentMaze._viewport is not None:
+            self._parentMaze._viewport.moveAgent(self)
+            return
         w=self._parentMaze._cell_width
         x=self.x*w-w+self._parentMaze._LabWidth
         y=self.y*w-w+self._parentMaze._LabWidth
@@ -153,7 +281,7 @@ class agent:
                     except:
                         pass
                 else:
-                    self._head=self._parentMaze._canvas.create_line(*self._coord,fill=self.color.value[0],arrow=FIRST,arrowshape=(3/10*w,4/10*w,4/10*w))#,outline=self.color.name)
+                    self._head=self._parentMaze._canvas.create_line(*self._coord,fill=self.color.value[0],arrow='first',arrowshape=(3/10*w,4/10*w,4/10*w))#,outline=self.color.name)
                     try:
                         self._parentMaze._canvas.tag_lower(self._head,'ov')
                     except:
@@ -195,6 +323,13 @@ class agent:
         '''
         To Rotate the agent in Counter Clock Wise direction
         '''
+        if self._parentMaze.headless:
+            self._orient=(self._orient-1)%4
+            return
+        if self._parentMaze._viewport is not None:
+            self._orient=(self._orient-1)%4
+            self._parentMaze._viewport.drawHead(self)
+            return
         def pointNew(p,newOrigin):
             return (p[0]-newOrigin[0],p[1]-newOrigin[1])
         w=self._parentMaze._cell_width
@@ -216,6 +351,13 @@ class agent:
         '''
         To Rotate the agent in Clock Wise direction
         '''
+        if self._parentMaze.headless:
+            self._orient=(self._orient+1)%4
+            return
+        if self._parentMaze._viewport is not None:
+            self._orient=(self._orient+1)%4
+            self._parentMaze._viewport.drawHead(self)
+            return
         def pointNew(p,newOrigin):
             return (p[0]-newOrigin[0],p[1]-newOrigin[1])
         w=self._parentMaze._cell_width
@@ -269,29 +411,324 @@ class textLabel:
     @value.setter
     def value(self,v):
         self._value=v
-        self._var.set(f'{self.title} : {v}')
+        if self._var is not None:
+            self._var.set(f'{self.title} : {v}')
     def drawLabel(self):
-        self._var = StringVar()
-        self.lab = Label(self._parentMaze._canvas, textvariable=self._var, bg="white", fg="black",font=('Helvetica bold',12),relief=RIDGE)
+        if self._parentMaze.headless:
+            return
+        tk=_tk()
+        self._var = tk.StringVar()
+        self.lab = tk.Label(self._parentMaze._canvas, textvariable=self._var, bg="white", fg="black",font=('Helvetica bold',12),relief=tk.RIDGE)
         self._var.set(f'{self.title} : {self.value}')
-        self.lab.pack(expand = True,side=LEFT,anchor=NW)
+        self.lab.pack(expand = True,side=tk.LEFT,anchor=tk.NW)
+
+class _Viewport:
+    '''
+    Scrollable and zoomable view of a maze, used with maze(viewport=True).
+    Only the tiles (_TILE x _TILE cells) inside the view are drawn. Drawn
+    tiles are cached and the least recently used ones are deleted from the
+    canvas (beyond _MAX_TILES) as the view is panned.
+    Footprints and marked cells are kept per tile and drawn with it, and the
+    agents are drawn only when they are inside the view.
+    '''
+    def __init__(self,parentMaze,theme):
+        self._maze=parentMaze
+        self.theme=theme
+        self._tiles=OrderedDict() # Drawn tiles, least recently used first
+        self._items={} # Tile --> [(cell,kind,tag,color)] footprints and marks
+        self._view=(0,0,-1,-1) # Cells in view r0,c0,r1,c1 (0 based, inclusive)
+        c=parentMaze._canvas
+        c.bind('<Configure>',lambda e:self.update())
+        c.bind('<ButtonPress-1>',lambda e:c.scan_mark(e.x,e.y))
+        c.bind('<B1-Motion>',lambda e:c.scan_dragto(e.x,e.y,gain=1))
+        c.bind('<MouseWheel>',lambda e:self._scroll(c.yview_scroll,e.delta))
+        c.bind('<Shift-MouseWheel>',lambda e:self._scroll(c.xview_scroll,e.delta))
+        c.bind('<Control-MouseWheel>',lambda e:self._zoomWheel(e,e.delta))
+        for b,d in (('4',1),('5',-1)): # Mouse wheel on X11
+            c.bind(f'<Button-{b}>',lambda e,d=d:self._scroll(c.yview_scroll,d))
+            c.bind(f'<Shift-Button-{b}>',lambda e,d=d:self._scroll(c.xview_scroll,d))
+            c.bind(f'<Control-Button-{b}>',lambda e,d=d:self._zoomWheel(e,d))
+        self._setScrollRegion()
+    def _scroll(self,scroll,delta):
+        scroll(-3 if delta>0 else 3,'units')
+    def _zoomWheel(self,e,delta):
+        self.zoom(1.25 if delta>0 else 0.8,e.x,e.y)
+    def _setScrollRegion(self):
+        m=self._maze
+        w=m._cell_width
+        self._maze._canvas.configure(scrollregion=(0,0,m.cols*w+2*m._LabWidth,m.rows*w+2*m._LabWidth))
+    def _visible(self):
+        m=self._maze
+        c=m._canvas
+        w=m._cell_width
+        L=m._LabWidth
+        c0=max(0,int((c.canvasx(0)-L)//w))
+        c1=min(m.cols-1,int((c.canvasx(c.winfo_width())-L)//w))
+        r0=max(0,int((c.canvasy(0)-L)//w))
+        r1=min(m.rows-1,int((c.canvasy(c.winfo_height())-L)//w))
+        return r0,c0,r1,c1
+    def _tileTag(self,t):
+        return f't{t[0]}_{t[1]}'
+    def update(self):
+        '''
+        To draw the tiles and agents in view, e.g. after scrolling
+        '''
+        c=self._maze._canvas
+        self._view=r0,c0,r1,c1=self._visible()
+        visible=[(tr,tc) for tr in range(r0//_TILE,r1//_TILE+1) for tc in range(c0//_TILE,c1//_TILE+1)]
+        for t in visible:
+            if t in self._tiles:
+                self._tiles.move_to_end(t)
+            else:
+                self._drawTile(t)
+                self._tiles[t]=True
+        while len(self._tiles)>max(_MAX_TILES,len(visible)):
+            t,_=self._tiles.popitem(last=False)
+            c.delete(self._tileTag(t))
+        for a in self._maze._agents:
+            self.drawHead(a)
+    def zoom(self,factor,x=None,y=None):
+        '''
+        To zoom by factor, keeping the point (x,y) of the window in place
+        (by default the centre of the window)
+        '''
+        m=self._maze
+        c=m._canvas
+        L=m._LabWidth
+        w=m._cell_width
+        new=min(90,max(2,w*factor))
+        if new==w:
+            return
+        if x is None:
+            x,y=c.winfo_width()/2,c.winfo_height()/2
+        # The point in cells, to put it back under (x,y) after zooming
+        px=(c.canvasx(x)-L)/w
+        py=(c.canvasy(y)-L)/w
+        m._cell_width=new
+        c.delete('tile')
+        self._tiles.clear()
+        self._setScrollRegion()
+        c.xview_moveto((px*new+L-x)/(m.cols*new+2*L))
+        c.yview_moveto((py*new+L-y)/(m.rows*new+2*L))
+        self.update()
+    def _drawTile(self,t):
+        m=self._maze
+        r0=t[0]*_TILE
+        c0=t[1]*_TILE
+        tag=self._tileTag(t)
+        for item in self._items.get(t,()):
+            self._drawItem(*item,tag)
+        for line in m._wallLines(r0,min(r0+_TILE,m.rows),c0,min(c0+_TILE,m.cols)):
+            m._canvas.create_line(*line,width=2,fill=self.theme.value[1],tags=('line','tile',tag))
+    def _drawItem(self,cell,kind,tag,color,tileTag):
+        m=self._maze
+        c=m._canvas
+        w=m._cell_width
+        x=cell[0]*w-w+m._LabWidth
+        y=cell[1]*w-w+m._LabWidth
+        tags=(tag,'tile',tileTag)
+        if kind=='ov':
+            c.create_oval(y + w/2.5+w/20, x + w/2.5+w/20,y + w/2.5 +w/4-w/20, x + w/2.5 +w/4-w/20,fill=color,outline=color,tags=tags+('ov',))
+            c.tag_raise('ov')
+            c.tag_raise('head')
+        else:
+            if kind=='filled':
+                item=c.create_rectangle(y, x,y + w, x + w,fill=color,outline='',tags=tags)
+            else:
+                item=c.create_rectangle(y + w/2.5, x + w/2.5,y + w/2.5 +w/4, x + w/2.5 +w/4,fill=color,outline='',tags=tags)
+            c.tag_lower(item)
+    def _add(self,cell,kind,tag,color):
+        t=((cell[0]-1)//_TILE,(cell[1]-1)//_TILE)
+        self._items.setdefault(t,[]).append((cell,kind,tag,color))
+        if t in self._tiles:
+            self._drawItem(cell,kind,tag,color,self._tileTag(t))
+    def moveAgent(self,a):
+        '''
+        Agent a moved: leave its footprint on the previous cell and draw it
+        '''
+        cell=(a.x,a.y)
+        last=getattr(a,'_viewCell',None)
+        if getattr(a,'footprints',False) and last is not None and last!=cell:
+            kind='filled' if a.filled and a.shape=='square' else 'square'
+            self._add(last,kind,f'a{id(a)}',a.color.value[1])
+        a._viewCell=cell
+        self.drawHead(a)
+    def mark(self,cell):
+        self._add(cell,'ov','mark','red')
+    def killAgent(self,a):
+        '''
+        To remove an agent and its footprints
+        '''
+        a._viewKilled=True
+        tag=f'a{id(a)}'
+        self._maze._canvas.delete(tag)
+        for items in self._items.values():
+            items[:]=[i for i in items if i[2]!=tag]
+    def drawHead(self,a):
+        '''
+        To draw the agent a if it is in view
+        '''
+        m=self._maze
+        c=m._canvas
+        c.delete(f'h{id(a)}')
+        r0,c0,r1,c1=self._view
+        if getattr(a,'_viewKilled',False) or not (r0<a.x<=r1+1 and c0<a.y<=c1+1):
+            return
+        w=m._cell_width
+        x=a.x*w-w+m._LabWidth
+        y=a.y*w-w+m._LabWidth
+        tags=('head',f'h{id(a)}',f'a{id(a)}')
+        if a.shape=='arrow':
+            dy,dx=((0,-1),(1,0),(0,1),(-1,0))[a._orient%4] # N,E,S,W
+            cy,cx=y+w/2,x+w/2
+            c.create_line(cy+dy*w/8,cx+dx*w/8,cy-dy*w/8,cx-dx*w/8,fill=a.color.value[0],arrow='first',arrowshape=(3/10*w,4/10*w,4/10*w),tags=tags)
+        elif a.filled:
+            c.create_rectangle(y, x,y + w, x + w,fill=a.color.value[0],outline='',tags=tags)
+        else:
+            c.create_rectangle(y + w/2.5, x + w/2.5,y + w/2.5 +w/4, x + w/2.5 +w/4,fill=a.color.value[0],outline='',tags=tags)
+        c.tag_raise('head')
+
+class _Grid:
+    '''
+    List like sequence of all the cells (x,y) of the maze, column by column.
+    The cells are computed on the fly, so membership is a bounds check and
+    no tuple is stored per cell.
+    '''
+    __slots__=('rows','cols')
+    def __init__(self,rows,cols):
+        self.rows=rows
+        self.cols=cols
+    def __len__(self):
+        return self.rows*self.cols
+    def __iter__(self):
+        for y in range(1,self.cols+1):
+            for x in range(1,self.rows+1):
+                yield (x,y)
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i<0:
+            i+=len(self)
+        if not 0<=i<len(self):
+            raise IndexError('grid index out of range')
+        return (i%self.rows+1,i//self.rows+1)
+    def __contains__(self,cell):
+        try:
+            x,y=cell
+            return 0<x<=self.rows and 0<y<=self.cols
+        except (TypeError,ValueError):
+            return False
+    def __eq__(self,other):
+        try:
+            return len(self)==len(other) and all(a==b for a,b in zip(self,other))
+        except TypeError:
+            return NotImplemented
+    def __repr__(self):
+        return repr(list(self))
+
+class JunctionGraph:
+    '''
+    The Maze with its corridors collapsed.
+    The nodes are the cells that do not have exactly two open sides
+    (junctions and dead ends), the edges are the corridors between them.
+    Cells are flat indices (x-1)*cols+(y-1) like the wall grid.
+    edges-->    Dictionary {node:[(node,length,side),...]} where side is the
+                side (_E,_W,_N or _S) the corridor leaves the first node by
+    isNode-->   Bytearray, 1 for the nodes
+    Use maze.junctions to get the graph of a Maze, it is built once and kept
+    until the walls change.
+    '''
+    def __init__(self,parentMaze):
+        rows,cols=parentMaze.rows,parentMaze.cols
+        self.rows=rows
+        self.cols=cols
+        n=rows*cols
+        sides=parentMaze._openSides()
+        self._sides=sides
+        self._step={_E:1,_W:-1,_N:-cols,_S:cols}
+        self.isNode=sides.translate(bytes(0 if d==2 else 1 for d in _DEGREE))
+        self.edges={}
+        for i in range(n):
+            if self.isNode[i]:
+                self.edges[i]=[self.walk(i,s)[:2]+(s,) for s in (_E,_W,_N,_S) if sides[i]&s]
+    def index(self,cell):
+        return (cell[0]-1)*self.cols+cell[1]-1
+    def cell(self,i):
+        return (i//self.cols+1,i%self.cols+1)
+    def openSides(self,i):
+        '''
+        The open sides of the cell i.
+        '''
+        return [s for s in (_E,_W,_N,_S) if self._sides[i]&s]
+    def walk(self,i,side,stop=None):
+        '''
+        To follow the corridor leaving cell i by side up to the first node
+        (or the cell stop, or back to i for a corridor closed on itself).
+        Returns (end cell,length,side of the end cell leading back).
+        '''
+        sides=self._sides
+        isNode=self.isNode
+        step=self._step
+        j=i
+        n=0
+        while True:
+            j+=step[side]
+            n+=1
+            back=_OPPOSITE[side]
+            if isNode[j] or j==stop or j==i:
+                return j,n,back
+            side=sides[j]^back
+    def cells(self,i,side,length):
+        '''
+        The length cells following cell i on the corridor leaving it by side,
+        as (x,y) tuples.
+        '''
+        sides=self._sides
+        step=self._step
+        cells=[]
+        j=i
+        for _ in range(length):
+            j+=step[side]
+            cells.append(self.cell(j))
+            side=sides[j]^_OPPOSITE[side]
+        return cells
+    def __len__(self):
+        return len(self.edges)
 
 class maze:
     '''
     This is the main class to create maze.
     '''
-    def __init__(self,rows=10,cols=10):
+    def __init__(self,rows=10,cols=10,headless=False,rasterize=None,viewport=False):
         '''
         rows--> No. of rows of the maze
         cols--> No. of columns of the maze
+        headless--> True to use the maze without any Tkinter window, e.g. on
+                    machines without a display. Generation, loading, saving and
+                    solving work as usual but nothing is drawn, tracePath does
+                    not animate and run returns immediately.
+        rasterize-->    True to draw the maze as a single image instead of lines,
+                        False to always draw lines. By default mazes with more
+                        than _RASTER_CELLS cells are drawn as an image.
+        viewport-->     True for a scrollable and zoomable window which draws only
+                        the part of the maze in view, for very big mazes.
+                        Scroll with the mouse wheel (Shift for horizontal), drag
+                        with the left button and zoom with Ctrl + mouse wheel.
         Need to pass just the two arguments. The rest will be assigned automatically
-        maze_map--> Will be set to a Dicationary. Keys will be cells and
-                    values will be another dictionary with keys=['E','W','N','S'] for
+        maze_map--> A Dictionary like view. Keys will be cells and
+                    values will be another dictionary like view with keys=['E','W','N','S'] for
                     East West North South and values will be 0 or 1. 0 means that 
                     direction(EWNS) is blocked. 1 means that direction is open.
-        grid--> A list of all cells
+        _walls--> The packed wall grid behind maze_map. A bytearray with one byte
+                  per cell, row by row, cell (x,y) at index (x-1)*cols+(y-1).
+                  The bits _E,_W,_N,_S of the byte are set for the open sides.
+        grid--> A list like sequence of all cells
         path--> Shortest path from start(bottom right) to goal(by default top left)
-                It will be a dictionary
+                It will be a dictionary. For a maze loaded from a binary file
+                it is calculated on first use.
+        seed--> The random seed the maze was generated with, if known.
+        algorithm,generationTime--> The generator used by CreateMaze and the
+                                    time (seconds) it took.
         _win,_cell_width,_canvas -->    _win and )canvas are for Tkinter window and canvas
                                         _cell_width is cell width calculated automatically
         _agents-->  A list of aganets on the maze
@@ -301,50 +738,299 @@ class maze:
         '''
         self.rows=rows
         self.cols=cols
-        self.maze_map={}
+        self.headless=headless
+        self.rasterize=rasterize
+        self.viewport=viewport
+        self._viewport=None
         self.grid=[]
         self.path={} 
+        # Start of the path, None for the lower right corner
+        self._start=None
+        self.seed=None
+        self.algorithm=None
+        self.generationTime=None
         self._cell_width=50  
         self._win=None 
         self._canvas=None
         self._agents=[]
         self.markCells=[]
+        self._traceQueue=[]
 
     @property
+    def path(self):
+        if self._path is None:
+            self._path=self._shortestPath()
+        return self._path
+    @path.setter
+    def path(self,p):
+        # Every change of the walls or of the goal ends with setting the path
+        # (maze_map and _Open_* writes set it to None), so this is where the
+        # distance field and the junctions get stale.
+        self._path=p
+        self._field=None
+        self._junctions=None
+    @property
+    def junctions(self):
+        '''
+        The JunctionGraph of the Maze, built on first use.
+        '''
+        if self._junctions is None:
+            self._junctions=JunctionGraph(self)
+        return self._junctions
+    @property
     def grid(self):
         return self._grid
     @grid.setter        
     def grid(self,n):
-        self._grid=[]
-        y=0
-        for n in range(self.cols):
-            x = 1
-            y = 1+y
-            for m in range(self.rows):
-                self.grid.append((x,y))
-                self.maze_map[x,y]={'E':0,'W':0,'N':0,'S':0}
-                x = x + 1 
+        self._grid=_Grid(self.rows,self.cols)
+        self._walls=bytearray(self.rows*self.cols)
+        self.maze_map=_MazeMap(self)
+    def _shortestPath(self):
+        '''
+        The shortest path from start(bottom right, or the start given to
+        prune_dead_ends) to the goal, read from the distance field.
+        This will be used only when there are multiple paths (loopPercent>0) or
+        Maze is loaded from a file.
+        If a perfect maze is generated and without the load file, this method will
+        not be used since the Maze generation will calculate the path.
+        '''
+        try:
+            return self.path_from(self._start or (self.rows,self.cols))
+        except ValueError:
+            print('Path to goal not found!')
+            return
+    def _distanceField(self):
+        '''
+        Breadth First Search from the goal over the whole Maze, done once and
+        kept until the walls or the goal change.
+        Returns two flat arrays indexed by (x-1)*cols+(y-1):
+        dist-->     Number of steps from the cell to the goal (-1 if unreachable)
+        step-->     The side (_E,_W,_N or _S) to leave the cell by to get closer
+                    to the goal
+        '''
+        if self._field is not None:
+            return self._field
+        walls=self._walls
+        cols=self.cols
+        n=self.rows*cols
+        if np is not None:
+            sides=np.frombuffer(self._openSides(),dtype=np.uint8)
+            dist=self._wavefront(self._goal,sides)
+            # Every cell leaves by an open side towards a cell one step closer
+            step=np.zeros(n,dtype=np.uint8)
+            for bit,off in ((_W,-1),(_S,cols),(_E,1),(_N,-cols)):
+                i=np.flatnonzero((sides&bit!=0)&(step==0)&(dist>0))
+                i=i[dist[i+off]==dist[i]-1]
+                step[i]=bit
+            self._field=(array('i',dist.tobytes()),bytearray(step.tobytes()))
+            return self._field
+        dist=array('i',[-1])*n
+        step=bytearray(n)
+        g=(self._goal[0]-1)*cols+self._goal[1]-1
+        dist[g]=0
+        frontier=[g]
+        # The frontier list only grows, iterating it is the BFS queue.
+        for i in frontier:
+            v=walls[i]
+            d=dist[i]+1
+            c=i%cols
+            if v&_W and c and dist[i-1]<0:
+                dist[i-1]=d
+                step[i-1]=_E
+                frontier.append(i-1)
+            if v&_S and i+cols<n and dist[i+cols]<0:
+                dist[i+cols]=d
+                step[i+cols]=_N
+                frontier.append(i+cols)
+            if v&_E and c+1<cols and dist[i+1]<0:
+                dist[i+1]=d
+                step[i+1]=_W
+                frontier.append(i+1)
+            if v&_N and i>=cols and dist[i-cols]<0:
+                dist[i-cols]=d
+                step[i-cols]=_S
+                frontier.append(i-cols)
+        self._field=(dist,step)
+        return self._field
+    def wavefront(self,source=None,target=None):
+        '''
+        Breadth First Search from source (default value is the goal) to all
+        the cells, expanding the whole frontier at once with NumPy.
+        target-->   To stop as soon as this cell is reached
+        Returns a (rows,cols) int32 array with the number of steps from source
+        to every cell, -1 for the cells not reached.
+        '''
+        if np is None:
+            raise ImportError('maze.wavefront needs NumPy')
+        if source is None:
+            source=self._goal
+        sides=np.frombuffer(self._openSides(),dtype=np.uint8)
+        return self._wavefront(source,sides,target).reshape(self.rows,self.cols)
+    def _wavefront(self,source,sides,target=None):
+        '''
+        The flat distance array of wavefront. sides are the open sides of
+        the cells (_openSides) as a NumPy array.
+        '''
+        cols=self.cols
+        n=len(sides)
+        steps=((_E,1),(_W,-1),(_N,-cols),(_S,cols))
+        masks=[(sides&bit!=0,off) for bit,off in steps]
+        openSides=sides.tobytes()
+        seen=bytearray(n)
+        seenArray=np.frombuffer(seen,dtype=np.uint8)
+        dist=np.full(n,-1,dtype=np.int32)
+        s=(source[0]-1)*cols+source[1]-1
+        t=-1 if target is None else (target[0]-1)*cols+target[1]-1
+        dist[s]=0
+        seen[s]=1
+        frontier=[s]
+        d=0
+        while len(frontier) and not (t>=0 and seen[t]):
+            d+=1
+            if len(frontier)<_WAVEFRONT_SMALL:
+                # A few cells (a corridor of a perfect maze), one by one
+                nextFrontier=[]
+                for i in (frontier.tolist() if isinstance(frontier,np.ndarray) else frontier):
+                    v=openSides[i]
+                    for bit,off in steps:
+                        if v&bit and not seen[i+off]:
+                            seen[i+off]=1
+                            nextFrontier.append(i+off)
+            else:
+                # The open side masks of the frontier cells, shifted by the
+                # side offsets, are the cells one step further
+                frontier=np.asarray(frontier)
+                nextFrontier=np.concatenate([frontier[mask[frontier]]+off for mask,off in masks])
+                nextFrontier=nextFrontier[seenArray[nextFrontier]==0]
+                # A cell reached from two sides is kept once
+                pos=np.arange(len(nextFrontier),dtype=np.int32)
+                dist[nextFrontier]=pos
+                nextFrontier=nextFrontier[dist[nextFrontier]==pos]
+                seenArray[nextFrontier]=1
+            dist[nextFrontier]=d
+            frontier=nextFrontier
+        return dist
+    def distance(self,cell):
+        '''
+        Number of steps on the shortest path from cell to the goal,
+        or None if the goal can not be reached from cell.
+        '''
+        x,y=cell
+        if not (1<=x<=self.rows and 1<=y<=self.cols):
+            raise ValueError(f'{cell} is not a cell of the Maze')
+        d=self._distanceField()[0][(x-1)*self.cols+y-1]
+        return None if d<0 else d
+    def path_from(self,cell):
+        '''
+        The shortest path from cell to the goal as a dictionary {cell:next cell},
+        the same form as path.
+        No search is done, the path is followed on the distance field.
+        '''
+        d=self.distance(cell)
+        if d is None:
+            raise ValueError(f'Path to goal not found from {cell}!')
+        step=self._field[1]
+        cols=self.cols
+        x,y=cell
+        fwdPath={}
+        for _ in range(d):
+            s=step[(x-1)*cols+y-1]
+            if s==_E: nextCell=(x,y+1)
+            elif s==_W: nextCell=(x,y-1)
+            elif s==_N: nextCell=(x-1,y)
+            else: nextCell=(x+1,y)
+            fwdPath[(x,y)]=nextCell
+            x,y=nextCell
+        return fwdPath
+
+    def _openSides(self):
+        '''
+        A copy of the wall grid without the open sides leading out of the Maze.
+        '''
+        rows,cols=self.rows,self.cols
+        n=rows*cols
+        sides=bytearray(self._walls)
+        for i in range(0,n,cols):
+            sides[i]&=~_W
+            sides[i+cols-1]&=~_E
+        for i in range(cols):
+            sides[i]&=~_N
+            sides[n-cols+i]&=~_S
+        return sides
+    def prune_dead_ends(self,start=None,goal=None):
+        '''
+        Dead-end filling.
+        Walls in every dead end other than start and goal, again and again
+        as new dead ends appear, in one pass with a queue.
+        start-->    Default value is the lower right corner of the Maze
+        goal-->     Default value is the goal of the Maze
+        Returns a headless maze of the same size in which only the cells that
+        can be on a route from start to goal stay open (the loops stay as they
+        are). Its pruned attribute is the number of cells walled in and its
+        path starts from start.
+        The solvers can search it instead of the Maze. With another start than
+        the corner, give it to the solvers too, they start from the corner.
+        '''
+        if start is None:
+            start=(self.rows,self.cols)
+        if goal is None:
+            goal=self._goal
+        cols=self.cols
+        sides=self._openSides()
+        degree=sides.translate(_DEGREE)
+        step={_E:1,_W:-1,_N:-cols,_S:cols}
+        keep={(start[0]-1)*cols+start[1]-1,(goal[0]-1)*cols+goal[1]-1}
+        deadEnds=deque(i for i in range(len(sides)) if degree[i]==1 and i not in keep)
+        pruned=0
+        while deadEnds:
+            i=deadEnds.popleft()
+            if degree[i]!=1:
+                continue
+            s=sides[i]
+            j=i+step[s]
+            sides[i]=0
+            degree[i]=0
+            sides[j]&=~_OPPOSITE[s]
+            degree[j]-=1
+            pruned+=1
+            if degree[j]==1 and j not in keep:
+                deadEnds.append(j)
+        view=maze(self.rows,self.cols,headless=True)
+        view._walls=sides
+        view._goal=goal
+        view._start=start
+        view.path=None
+        view.pruned=pruned
+        return view
     def _Open_East(self,x, y):
         '''
         To remove the East Wall of the cell
         '''
-        self.maze_map[x,y]['E']=1
+        i=(x-1)*self.cols+y-1
+        self._walls[i]|=_E
         if y+1<=self.cols:
-            self.maze_map[x,y+1]['W']=1
+            self._walls[i+1]|=_W
+        self.path=None
     def _Open_West(self,x, y):
-        self.maze_map[x,y]['W']=1
+        i=(x-1)*self.cols+y-1
+        self._walls[i]|=_W
         if y-1>0:
-            self.maze_map[x,y-1]['E']=1
+            self._walls[i-1]|=_E
+        self.path=None
     def _Open_North(self,x, y):
-        self.maze_map[x,y]['N']=1
+        i=(x-1)*self.cols+y-1
+        self._walls[i]|=_N
         if x-1>0:
-            self.maze_map[x-1,y]['S']=1
+            self._walls[i-self.cols]|=_S
+        self.path=None
     def _Open_South(self,x, y):
-        self.maze_map[x,y]['S']=1
+        i=(x-1)*self.cols+y-1
+        self._walls[i]|=_S
         if x+1<=self.rows:
-            self.maze_map[x+1,y]['N']=1
+            self._walls[i+self.cols]|=_N
+        self.path=None
     
-    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark):
+    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark,algorithm='backtracker',seed=None,cache=None):
         '''
         One very important function to create a Random Maze
         pattern-->  It can be 'v' for vertical or 'h' for horizontal
@@ -354,11 +1040,24 @@ class maze:
                         Higher value means there will be multiple paths (loops)
                         Higher the value (max 100) more will be the loops
         saveMaze--> To save the generated Maze as CSV file for future reference.
-        loadMaze--> Provide the CSV file to generate a desried maze
+                    saveMaze='binary' saves it in the binary .maze format instead.
+        loadMaze--> Provide the CSV or binary .maze file to generate a desried maze
         theme--> Dark or Light
+        algorithm-->    The maze generator, a key of GENERATORS:
+                        'backtracker' (default) the recursive backtracker
+                        'eller' Eller's algorithm, row by row (see ellerMaze to
+                                stream a maze bigger than memory)
+                        'kruskal' Kruskal's algorithm with Union-Find
+                        'wilson' Wilson's algorithm (uniform spanning tree)
+                        'binarytree' and 'sidewinder', simple O(n) generators
+                        pattern is used only by the backtracker.
+                        The time taken by the generator is kept in generationTime.
+        seed--> Seed of a local random number generator, to generate the same
+                maze again. Without a seed the global random module is used.
+        cache-->    A MazeCache to reuse mazes generated before with the same
+                    size, goal, pattern, loopPercent, algorithm and seed.
+                    Needs a seed.
         '''
-        _stack=[]
-        _closed=[]
         self.theme=theme
         self._goal=(x,y)
         if(isinstance(theme,str)):
@@ -366,37 +1065,185 @@ class maze:
                 self.theme=COLOR[theme]
             else:
                 raise ValueError(f'{theme} is not a valid theme COLOR!')
+        if cache is not None and seed is None:
+            raise ValueError('A seed is needed to cache the maze!')
+        rng=random if seed is None else random.Random(seed)
+        cacheKey=None
+        if not loadMaze and cache is not None:
+            cacheKey=(self.rows,self.cols,x,y,pattern,loopPercent,algorithm,seed)
+            loadMaze=cache.get(cacheKey)
+            if loadMaze:
+                self.algorithm=algorithm
+                self.generationTime=None
+                cacheKey=None
+        # if maze is to be generated randomly
+        if not loadMaze:
+            if algorithm not in GENERATORS:
+                raise ValueError(f'{algorithm} is not a valid maze algorithm!')
+            self.algorithm=algorithm
+            self.seed=seed
+            t=time.perf_counter()
+            GENERATORS[algorithm](self,rng,x,y,pattern)
+            self.generationTime=time.perf_counter()-t
+            ## Multiple Path Loops
+            if loopPercent!=0:
+                self._addLoops(loopPercent,rng)
+            if cacheKey is not None:
+                cache.put(cacheKey,self)
+        elif _isBinaryMaze(loadMaze):
+            self._loadBinary(loadMaze)
+        else:
+            self._loadCSV(loadMaze)
+            self.path=self._shortestPath()
+        if not self.headless:
+            self._drawMaze(self.theme)
+        agent(self,*self._goal,shape='square',filled=True,color=COLOR.green)
+        if saveMaze=='binary':
+            dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
+            self.saveBinary(f'maze--{dt_string}.maze')
+        elif saveMaze:
+            dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
+            with open(f'maze--{dt_string}.csv','w',newline='') as f:
+                writer=csv.writer(f)
+                writer.writerow(['  cell  ','E','W','N','S'])
+                walls=self._walls
+                cols=self.cols
+                for k in self.grid:
+                    v=walls[(k[0]-1)*cols+k[1]-1]
+                    writer.writerow([k,int(v&_E>0),int(v&_W>0),int(v&_N>0),int(v&_S>0)])
+                f.seek(0, os.SEEK_END)
+                f.seek(f.tell()-2, os.SEEK_SET)
+                f.truncate()
+
+    def saveBinary(self,filename):
+        '''
+        To save the maze in the binary .maze format.
+        The file is the _HEADER (rows, cols, goal and seed) followed by the
+        packed wall grid as it is in memory, one byte per cell row by row.
+        The file is written next to filename and then moved over it, as the
+        walls of a maze loaded from filename are still mapped from it.
+        '''
+        seed=self.seed if isinstance(self.seed,int) and 0<=self.seed<2**63 else -1
+        tmp=f'{filename}.{os.getpid()}.tmp'
+        try:
+            with open(tmp,'wb') as f:
+                f.write(_HEADER.pack(_MAGIC,_VERSION,self.rows,self.cols,*self._goal,seed))
+                f.write(self._walls)
+            os.replace(tmp,filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _backtracker(self,x,y,pattern,rng=random):
+        '''
+        Maze generation with the recursive backtracker starting from the cell (x,y).
+        The path is read from the distance field when it is needed, like for
+        the other generators.
+        '''
+        walls=self._walls
+        rows=self.rows
+        cols=self.cols
+        last=(rows-1)*cols
+        # Directions 0-3 are E,W,S,N: index step, side opened in the cell
+        # and side opened in the neighbour (same as _Open_East etc.)
+        step=(1,-1,cols,-cols)
+        side=(_E,_W,_S,_N)
+        back=(_W,_E,_N,_S)
+        # Cells on the stack by their index
+        i=(x-1)*cols+y-1
+        _stack=[i]
+        # Visited bitmap of the generation, one byte per cell like _walls
+        _closed=bytearray(rows*cols)
+        _closed[i]=1
+        if pattern is not None:
+            pattern=pattern.lower()
+        biasLength=2 # if pattern is 'v' or 'h'
+        if(pattern=='h'):
+            biasLength=max(self.cols//10,2)
+        if(pattern=='v'):
+            biasLength=max(self.rows//10,2)
+        bias=0
+
+        choice=rng.choice
+        while _stack:
+            cell = []
+            bias+=1
+            c=i%cols
+            if c<cols-1 and not _closed[i+1]:
+                cell.append(0)
+            if c and not _closed[i-1]:
+                cell.append(1)
+            if i<last and not _closed[i+cols]:
+                cell.append(2)
+            if i>=cols and not _closed[i-cols]:
+                cell.append(3)
+            if cell:    
+                if pattern=='h' and bias<=biasLength:
+                    if cell[0]<2:
+                        cell=[d for d in cell if d<2]
+                elif pattern=='v' and bias<=biasLength:
+                    if cell[-1]>=2:
+                        cell=[d for d in cell if d>=2]
+                else:
+                    bias=0
+                d=choice(cell)
+                walls[i]|=side[d]
+                i+=step[d]
+                walls[i]|=back[d]
+                _closed[i]=1
+                _stack.append(i)
+
+            else:
+                i=_stack.pop()
+        self.path=None
+
+    def _addLoops(self,loopPercent,rng=random):
+        '''
+        To remove some more walls so that there are multiple paths (loops)
+        and calculate the shortest path again.
+        With NumPy this is done in one batch by _addLoopsBatched.
+        '''
+        if np is not None:
+            self._addLoopsBatched(loopPercent,rng)
+            return
+        walls=self._walls
+        rows=self.rows
+        cols=self.cols
         def blockedNeighbours(cell):
             n=[]
-            for d in self.maze_map[cell].keys():
-                if self.maze_map[cell][d]==0:
-                    if d=='E' and (cell[0],cell[1]+1) in self.grid:
+            v=walls[(cell[0]-1)*cols+cell[1]-1]
+            for d,b in _BITS.items():
+                if not v&b:
+                    if d=='E' and cell[1]<cols:
                         n.append((cell[0],cell[1]+1))
-                    elif d=='W' and (cell[0],cell[1]-1) in self.grid:
+                    elif d=='W' and cell[1]>1:
                         n.append((cell[0],cell[1]-1))
-                    elif d=='N' and (cell[0]-1,cell[1]) in self.grid:
+                    elif d=='N' and cell[0]>1:
                         n.append((cell[0]-1,cell[1]))
-                    elif d=='S' and (cell[0]+1,cell[1]) in self.grid:
+                    elif d=='S' and cell[0]<rows:
                         n.append((cell[0]+1,cell[1]))
             return n
         def removeWallinBetween(cell1,cell2):
             '''
             To remove wall in between two cells
             '''
+            i1=(cell1[0]-1)*cols+cell1[1]-1
+            i2=(cell2[0]-1)*cols+cell2[1]-1
             if cell1[0]==cell2[0]:
                 if cell1[1]==cell2[1]+1:
-                    self.maze_map[cell1]['W']=1
-                    self.maze_map[cell2]['E']=1
+                    walls[i1]|=_W
+                    walls[i2]|=_E
                 else:
-                    self.maze_map[cell1]['E']=1
-                    self.maze_map[cell2]['W']=1
+                    walls[i1]|=_E
+                    walls[i2]|=_W
             else:
                 if cell1[0]==cell2[0]+1:
-                    self.maze_map[cell1]['N']=1
-                    self.maze_map[cell2]['S']=1
+                    walls[i1]|=_N
+                    walls[i2]|=_S
                 else:
-                    self.maze_map[cell1]['S']=1
-                    self.maze_map[cell2]['N']=1
+                    walls[i1]|=_S
+                    walls[i2]|=_N
         def isCyclic(cell1,cell2):
             '''
             To avoid too much blank(clear) path.
@@ -404,213 +1251,193 @@ class maze:
             ans=False
             if cell1[0]==cell2[0]:
                 if cell1[1]>cell2[1]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['S']==1 and self.maze_map[cell2]['S']==1:
-                    if (cell1[0]+1,cell1[1]) in self.grid and self.maze_map[(cell1[0]+1,cell1[1])]['E']==1:
+                i1=(cell1[0]-1)*cols+cell1[1]-1
+                i2=i1+1
+                if walls[i1]&_S and walls[i2]&_S:
+                    if cell1[0]<rows and walls[i1+cols]&_E:
                         ans= True
-                if self.maze_map[cell1]['N']==1 and self.maze_map[cell2]['N']==1:
-                    if (cell1[0]-1,cell1[1]) in self.grid and self.maze_map[(cell1[0]-1,cell1[1])]['E']==1:
+                if walls[i1]&_N and walls[i2]&_N:
+                    if cell1[0]>1 and walls[i1-cols]&_E:
                         ans= True
             else:
                 if cell1[0]>cell2[0]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['E']==1 and self.maze_map[cell2]['E']==1:
-                    if (cell1[0],cell1[1]+1) in self.grid and self.maze_map[(cell1[0],cell1[1]+1)]['S']==1:
+                i1=(cell1[0]-1)*cols+cell1[1]-1
+                i2=i1+cols
+                if walls[i1]&_E and walls[i2]&_E:
+                    if cell1[1]<cols and walls[i1+1]&_S:
                         ans= True
-                if self.maze_map[cell1]['W']==1 and self.maze_map[cell2]['W']==1:
-                    if (cell1[0],cell1[1]-1) in self.grid and self.maze_map[(cell1[0],cell1[1]-1)]['S']==1:
+                if walls[i1]&_W and walls[i2]&_W:
+                    if cell1[1]>1 and walls[i1-1]&_S:
                         ans= True
             return ans
-        def BFS(cell):
-            '''
-            Breadth First Search
-            To generate the shortest path.
-            This will be used only when there are multiple paths (loopPercent>0) or
-            Maze is loaded from a CSV file.
-            If a perfect maze is generated and without the load file, this method will
-            not be used since the Maze generation will calculate the path.
-            '''
-            frontier = deque()
-            frontier.append(cell)
-            path = {}
-            visited = {(self.rows,self.cols)}
-            while len(frontier) > 0:
-                cell = frontier.popleft()
-                if self.maze_map[cell]['W'] and (cell[0],cell[1]-1) not in visited:
-                    nextCell = (cell[0],cell[1]-1)
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['S'] and (cell[0]+1,cell[1]) not in visited:    
-                    nextCell = (cell[0]+1,cell[1])
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['E'] and (cell[0],cell[1]+1) not in visited:
-                    nextCell = (cell[0],cell[1]+1)
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['N'] and (cell[0]-1,cell[1]) not in visited:
-                    nextCell = (cell[0]-1,cell[1])
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-            fwdPath={}
-            cell=self._goal
-            while cell!=(self.rows,self.cols):
-                try:
-                    fwdPath[path[cell]]=cell
-                    cell=path[cell]
-                except:
-                    print('Path to goal not found!')
-                    return
-            return fwdPath
-        # if maze is to be generated randomly
-        if not loadMaze:
-            _stack.append((x,y))
-            _closed.append((x,y))
-            biasLength=2 # if pattern is 'v' or 'h'
-            if(pattern is not None and pattern.lower()=='h'):
-                biasLength=max(self.cols//10,2)
-            if(pattern is not None and pattern.lower()=='v'):
-                biasLength=max(self.rows//10,2)
-            bias=0
-
-            while len(_stack) > 0:
-                cell = []
-                bias+=1
-                if(x , y +1) not in _closed and (x , y+1) in self.grid:
-                    cell.append("E")
-                if (x , y-1) not in _closed and (x , y-1) in self.grid:
-                    cell.append("W")
-                if (x+1, y ) not in _closed and (x+1 , y ) in self.grid:
-                    cell.append("S")
-                if (x-1, y ) not in _closed and (x-1 , y) in self.grid:
-                    cell.append("N") 
-                if len(cell) > 0:    
-                    if pattern is not None and pattern.lower()=='h' and bias<=biasLength:
-                        if('E' in cell or 'W' in cell):
-                            if 'S' in cell:cell.remove('S')
-                            if 'N' in cell:cell.remove('N')
-                    elif pattern is not None and pattern.lower()=='v' and bias<=biasLength:
-                        if('N' in cell or 'S' in cell):
-                            if 'E' in cell:cell.remove('E')
-                            if 'W' in cell:cell.remove('W')
-                    else:
-                        bias=0
-                    current_cell = (random.choice(cell))
-                    if current_cell == "E":
-                        self._Open_East(x,y)
-                        self.path[x, y+1] = x, y
-                        y = y + 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "W":
-                        self._Open_West(x, y)
-                        self.path[x , y-1] = x, y
-                        y = y - 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "N":
-                        self._Open_North(x, y)
-                        self.path[(x-1 , y)] = x, y
-                        x = x - 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "S":
-                        self._Open_South(x, y)
-                        self.path[(x+1 , y)] = x, y
-                        x = x + 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
+        x,y=self.rows,self.cols
+        pathCells=[(x,y)]
+        while x!=self.rows or y!=self.cols:
+            x,y=self.path[(x,y)]
+            pathCells.append((x,y))
+        onPath=bytearray(rows*cols)
+        for i in pathCells:
+            onPath[(i[0]-1)*cols+i[1]-1]=1
+        notPathCells=[i for i in self.grid if not onPath[(i[0]-1)*cols+i[1]-1]]
+        rng.shuffle(pathCells)
+        rng.shuffle(notPathCells)
+        pathLength=len(pathCells)
+        notPathLength=len(notPathCells)
+        count1,count2=pathLength/3*loopPercent/100,notPathLength/3*loopPercent/100
+        
+        #remove blocks from shortest path cells
+        count=0
+        i=0
+        while count<count1: #these many blocks to remove
+            if len(blockedNeighbours(pathCells[i]))>0:
+                cell=rng.choice(blockedNeighbours(pathCells[i]))
+                if not isCyclic(cell,pathCells[i]):
+                    removeWallinBetween(cell,pathCells[i])
+                    count+=1
+                i+=1
+                    
+            else:
+                i+=1
+            if i==len(pathCells):
+                break
+        #remove blocks from outside shortest path cells
+        if len(notPathCells)>0:
+            count=0
+            i=0
+            while count<count2: #these many blocks to remove
+                if len(blockedNeighbours(notPathCells[i]))>0:
+                    cell=rng.choice(blockedNeighbours(notPathCells[i]))
+                    if not isCyclic(cell,notPathCells[i]):
+                        removeWallinBetween(cell,notPathCells[i])
+                        count+=1
+                    i+=1
+                        
+                else:
+                    i+=1
+                if i==len(notPathCells):
+                    break
+        self.path=self._shortestPath()
+
+    def _addLoopsBatched(self,loopPercent,rng):
+        '''
+        Loop insertion in batches with NumPy.
+        About rows*cols/3*loopPercent/100 walls are removed, like _addLoops.
+        In every batch all the closed inner walls are shuffled at once, the
+        ones that would open a 2x2 room (the isCyclic rule) are dropped with
+        vectorized checks of the neighbouring walls, and at most one wall is
+        removed per 2x2 square so that two removed walls can not make a room
+        together. A few batches (array scans) are enough to reach the count.
+        The shortest path is calculated on first use.
+        '''
+        rows,cols=self.rows,self.cols
+        n=rows*cols
+        w=np.frombuffer(self._walls,dtype=np.uint8)
+        g=w.reshape(rows,cols)
+        npRng=np.random.default_rng(rng.getrandbits(64))
+        idx=np.arange(n,dtype=np.int64).reshape(rows,cols)
+        room3=np.zeros(n,dtype=bool)
+        count=int(-(-n*loopPercent//300))
+        while count>0:
+            # Wall 2*i is the East wall of cell i and 2*i+1 its South wall
+            east=idx[:,:-1][(g[:,:-1]&_E)==0]
+            south=idx[:-1,:][(g[:-1,:]&_S)==0]
+            walls=npRng.permutation(np.concatenate((2*east,2*south+1)))
+            # room3[t]: the 2x2 square with top left cell t has 3 of its 4 inner walls open
+            if rows>1 and cols>1:
+                opened=((g[:-1,:-1]&_E)>0).astype(np.int8)+((g[1:,:-1]&_E)>0)+((g[:-1,:-1]&_S)>0)+((g[:-1,1:]&_S)>0)
+                room3.reshape(rows,cols)[:-1,:-1]=opened==3
+            a=walls>>1
+            isSouth=(walls&1)==1
+            r=a//cols
+            c=a%cols
+            # The (up to) two squares on either side of every wall, -1 if none
+            sq1=np.where(isSouth,np.where(c<cols-1,a,-1),np.where(r<rows-1,a,-1))
+            sq2=np.where(isSouth,np.where(c>0,a-1,-1),np.where(r>0,a-cols,-1))
+            bad=((sq1>=0)&room3[np.maximum(sq1,0)])|((sq2>=0)&room3[np.maximum(sq2,0)])
+            a,isSouth,sq1,sq2=a[~bad],isSouth[~bad],sq1[~bad],sq2[~bad]
+            # Keep a wall only if it comes first for both of its squares
+            k=len(a)
+            pos=np.arange(k)
+            firstWall=np.full(n+1,k)
+            sq1=np.where(sq1>=0,sq1,n)
+            sq2=np.where(sq2>=0,sq2,n)
+            np.minimum.at(firstWall,sq1,pos)
+            np.minimum.at(firstWall,sq2,pos)
+            keep=((sq1==n)|(firstWall[sq1]==pos))&((sq2==n)|(firstWall[sq2]==pos))
+            a,isSouth=a[keep][:count],isSouth[keep][:count]
+            if len(a)==0:
+                break
+            e=a[~isSouth]
+            w[e]|=_E
+            w[e+1]|=_W
+            s=a[isSouth]
+            w[s]|=_S
+            w[s+cols]|=_N
+            count-=len(a)
+        self.path=None
 
+    def _loadCSV(self,filename):
+        '''
+        To load a CSV maze file in a single streaming pass.
+        The dimensions are inferred while parsing: every row of the maze is
+        filled from left to right as its cells stream in (the saved files go
+        column by column) and the rows are joined into the wall grid at the end.
+        '''
+        rowWalls=[]
+        cols=0
+        with open(filename,'r',newline='') as f:
+            r=csv.reader(f)
+            next(r)
+            for i in r:
+                if not i:
+                    continue
+                x,y=i[0].strip('()').split(',')
+                x=int(x)
+                y=int(y)
+                v=int(i[1])*_E|int(i[2])*_W|int(i[3])*_N|int(i[4])*_S
+                if y==1 and x==len(rowWalls)+1:
+                    rowWalls.append(bytearray((v,)))
+                elif 0<x<=len(rowWalls) and len(rowWalls[x-1])==y-1:
+                    rowWalls[x-1].append(v)
                 else:
-                    x, y = _stack.pop()
+                    raise ValueError(f'{filename} is not a valid maze file!')
+                if y>cols:
+                    cols=y
+        if not rowWalls or any(len(row)!=cols for row in rowWalls):
+            raise ValueError(f'{filename} is not a valid maze file!')
+        walls=bytearray()
+        for x in range(len(rowWalls)):
+            walls+=rowWalls[x]
+            rowWalls[x]=None
+        self.rows=len(walls)//cols
+        self.cols=cols
+        self._grid=_Grid(self.rows,cols)
+        self._walls=walls
 
-            ## Multiple Path Loops
-            if loopPercent!=0:
-                
-                x,y=self.rows,self.cols
-                pathCells=[(x,y)]
-                while x!=self.rows or y!=self.cols:
-                    x,y=self.path[(x,y)]
-                    pathCells.append((x,y))
-                notPathCells=[i for i in self.grid if i not in pathCells]
-                random.shuffle(pathCells)
-                random.shuffle(notPathCells)
-                pathLength=len(pathCells)
-                notPathLength=len(notPathCells)
-                count1,count2=pathLength/3*loopPercent/100,notPathLength/3*loopPercent/100
-                
-                #remove blocks from shortest path cells
-                count=0
-                i=0
-                while count<count1: #these many blocks to remove
-                    if len(blockedNeighbours(pathCells[i]))>0:
-                        cell=random.choice(blockedNeighbours(pathCells[i]))
-                        if not isCyclic(cell,pathCells[i]):
-                            removeWallinBetween(cell,pathCells[i])
-                            count+=1
-                        i+=1
-                            
-                    else:
-                        i+=1
-                    if i==len(pathCells):
-                        break
-                #remove blocks from outside shortest path cells
-                if len(notPathCells)>0:
-                    count=0
-                    i=0
-                    while count<count2: #these many blocks to remove
-                        if len(blockedNeighbours(notPathCells[i]))>0:
-                            cell=random.choice(blockedNeighbours(notPathCells[i]))
-                            if not isCyclic(cell,notPathCells[i]):
-                                removeWallinBetween(cell,notPathCells[i])
-                                count+=1
-                            i+=1
-                                
-                        else:
-                            i+=1
-                        if i==len(notPathCells):
-                            break
-                self.path=BFS((self.rows,self.cols))
-        else:
-            # Load maze from CSV file
-            with open(loadMaze,'r') as f:
-                last=list(f.readlines())[-1]
-                c=last.split(',')
-                c[0]=int(c[0].lstrip('"('))
-                c[1]=int(c[1].rstrip(')"'))
-                self.rows=c[0]
-                self.cols=c[1]
-                self.grid=[]
-
-            with open(loadMaze,'r') as f:
-                r=csv.reader(f)
-                next(r)
-                for i in r:
-                    c=i[0].split(',')
-                    c[0]=int(c[0].lstrip('('))
-                    c[1]=int(c[1].rstrip(')'))
-                    self.maze_map[tuple(c)]={'E':int(i[1]),'W':int(i[2]),'N':int(i[3]),'S':int(i[4])}
-            self.path=BFS((self.rows,self.cols))
-        self._drawMaze(self.theme)
-        agent(self,*self._goal,shape='square',filled=True,color=COLOR.green)
-        if saveMaze:
-            dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
-            with open(f'maze--{dt_string}.csv','w',newline='') as f:
-                writer=csv.writer(f)
-                writer.writerow(['  cell  ','E','W','N','S'])
-                for k,v in self.maze_map.items():
-                    entry=[k]
-                    for i in v.values():
-                        entry.append(i)
-                    writer.writerow(entry)
-                f.seek(0, os.SEEK_END)
-                f.seek(f.tell()-2, os.SEEK_SET)
-                f.truncate()
+    def _loadBinary(self,filename):
+        '''
+        To load a binary .maze file.
+        The file is memory mapped (copy on write) and the wall grid is a view
+        into the mapping, so opening is instant and only the pages touched
+        later are read. The shortest path is calculated on first use.
+        '''
+        with open(filename,'rb') as f:
+            header=f.read(_HEADER.size)
+            if len(header)<_HEADER.size:
+                raise ValueError(f'{filename} is not a valid maze file!')
+            magic,version,rows,cols,gx,gy,seed=_HEADER.unpack(header)
+            if magic!=_MAGIC or version!=_VERSION:
+                raise ValueError(f'{filename} is not a valid maze file!')
+            mm=mmap.mmap(f.fileno(),0,access=mmap.ACCESS_COPY)
+        if len(mm)<_HEADER.size+rows*cols:
+            raise ValueError(f'{filename} is truncated!')
+        self.rows=rows
+        self.cols=cols
+        self._grid=_Grid(rows,cols)
+        self._walls=memoryview(mm)[_HEADER.size:_HEADER.size+rows*cols]
+        self._goal=(gx,gy)
+        self.seed=None if seed<0 else seed
+        self.path=None
 
     def _drawMaze(self,theme):
         '''
@@ -618,15 +1445,28 @@ class maze:
         '''
         
         self._LabWidth=26 # Space from the top for Labels
-        self._win=Tk()
+        tk=_tk()
+        self._win=tk.Tk()
         self._win.state('zoomed')
         self._win.title('PYTHON MAZE WORLD by Learning Orbis')
         
         scr_width=self._win.winfo_screenwidth()
         scr_height=self._win.winfo_screenheight()
         self._win.geometry(f"{scr_width}x{scr_height}+0+0")
-        self._canvas = Canvas(width=scr_width, height=scr_height, bg=theme.value[0]) # 0,0 is top left corner
-        self._canvas.pack(expand=YES, fill=BOTH)
+        self._canvas = tk.Canvas(width=scr_width, height=scr_height, bg=theme.value[0]) # 0,0 is top left corner
+        if self.viewport:
+            hbar=tk.Scrollbar(self._win,orient=tk.HORIZONTAL,command=self._canvas.xview)
+            vbar=tk.Scrollbar(self._win,orient=tk.VERTICAL,command=self._canvas.yview)
+            hbar.pack(side=tk.BOTTOM,fill=tk.X)
+            vbar.pack(side=tk.RIGHT,fill=tk.Y)
+            def scrolled(bar):
+                def set(*args):
+                    bar.set(*args)
+                    if self._viewport is not None:
+                        self._viewport.update()
+                return set
+            self._canvas.configure(xscrollcommand=scrolled(hbar),yscrollcommand=scrolled(vbar))
+        self._canvas.pack(expand=tk.YES, fill=tk.BOTH)
         # Some calculations for calculating the width of the maze cell
         k=3.25
         if self.rows>=95 and self.cols>=95:
@@ -644,22 +1484,119 @@ class maze:
         self._cell_width=round(min(((scr_height-self.rows-k*self._LabWidth)/(self.rows)),((scr_width-self.cols-k*self._LabWidth)/(self.cols)),90),3)
         
         # Creating Maze lines
+        if self.viewport:
+            self._cell_width=max(self._cell_width,_VIEWPORT_WIDTH)
+            self._viewport=_Viewport(self,theme)
+            return
         if self._win is not None:
-            if self.grid is not None:
-                for cell in self.grid:
-                    x,y=cell
-                    w=self._cell_width
-                    x=x*w-w+self._LabWidth
-                    y=y*w-w+self._LabWidth
-                    if self.maze_map[cell]['E']==False:
-                        l=self._canvas.create_line(y + w, x, y + w, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['W']==False:
-                        l=self._canvas.create_line(y, x, y, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['N']==False:
-                        l=self._canvas.create_line(y, x, y + w, x,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['S']==False:
-                        l=self._canvas.create_line(y, x + w, y + w, x + w,width=2,fill=theme.value[1],tag='line')
+            raster=self.rasterize
+            if raster is None:
+                raster=self.rows*self.cols>_RASTER_CELLS
+            if raster:
+                self._drawRaster(theme)
+            else:
+                for line in self._wallLines():
+                    self._canvas.create_line(*line,width=2,fill=theme.value[1],tag='line')
+
+    def _wallLines(self,r0=0,r1=None,c0=0,c1=None):
+        '''
+        Canvas coordinates of the maze lines.
+        Collinear walls next to each other are merged into one line, so there
+        is one line per horizontal or vertical run of walls (and every wall
+        is drawn once, not from both its cells).
+        A wall is drawn if it is closed on either side.
+        r0,r1,c0,c1-->  To get only the lines of the rows r0 to r1-1 and
+                        columns c0 to c1-1 (0 based). The lines on the bottom
+                        and right sides belong to the next rows/columns.
+        '''
+        rows,cols,walls=self.rows,self.cols,self._walls
+        if r1 is None: r1=rows
+        if c1 is None: c1=cols
+        w=self._cell_width
+        L=self._LabWidth
+        def runs(closed):
+            start=None
+            for i,c in enumerate(closed):
+                if c and start is None:
+                    start=i
+                elif not c and start is not None:
+                    yield start,i
+                    start=None
+            if start is not None:
+                yield start,len(closed)
+        # Horizontal lines, on top of row b+1
+        for b in range(r0,r1+1 if r1==rows else r1):
+            if b==0:
+                closed=[not walls[c]&_N for c in range(c0,c1)]
+            elif b==rows:
+                closed=[not walls[(rows-1)*cols+c]&_S for c in range(c0,c1)]
+            else:
+                up=(b-1)*cols
+                closed=[not (walls[up+c]&_S and walls[up+cols+c]&_N) for c in range(c0,c1)]
+            for a,z in runs(closed):
+                yield ((c0+a)*w+L,b*w+L,(c0+z)*w+L,b*w+L)
+        # Vertical lines, on the left of column b+1
+        for b in range(c0,c1+1 if c1==cols else c1):
+            if b==0:
+                closed=[not walls[r*cols]&_W for r in range(r0,r1)]
+            elif b==cols:
+                closed=[not walls[r*cols+cols-1]&_E for r in range(r0,r1)]
+            else:
+                closed=[not (walls[r*cols+b-1]&_E and walls[r*cols+b]&_W) for r in range(r0,r1)]
+            for a,z in runs(closed):
+                yield (b*w+L,(r0+a)*w+L,b*w+L,(r0+z)*w+L)
+
+    def _drawRaster(self,theme):
+        '''
+        To draw the maze as a single image instead of canvas lines.
+        Every cell is 2x2 pixels of _rasterPPM (the cell and its wall pixels),
+        zoomed to the cell width, so the cell width becomes an even number
+        of pixels (at least 2).
+        '''
+        tk=_tk()
+        rgb=lambda color: tuple(v>>8 for v in self._win.winfo_rgb(color))
+        img=tk.PhotoImage(data=self._rasterPPM(rgb(theme.value[1]),rgb(theme.value[0])),format='PPM')
+        k=max(1,int(self._cell_width//2))
+        if k>1:
+            img=img.zoom(k)
+        self._cell_width=2*k
+        self._image=img # Tkinter does not keep a reference to the image
+        self._canvas.create_image(self._LabWidth,self._LabWidth,image=img,anchor='nw',tag='line')
 
+    def _rasterPPM(self,wall,background):
+        '''
+        The maze as a binary PPM image of (2*cols+1)x(2*rows+1) pixels.
+        Cell (x,y) is the pixel (2*y-1,2*x-1) and the pixels between cells
+        are walls (color wall) or passages (color background).
+        '''
+        rows,cols,walls=self.rows,self.cols,self._walls
+        width=2*cols+1
+        # Packed wall byte --> 1 if that side is closed else 0
+        closed={b:bytes(0 if v&b else 1 for v in range(256)) for b in _BITS.values()}
+        def either(a,b):
+            return (int.from_bytes(a,'big')|int.from_bytes(b,'big')).to_bytes(len(a),'big')
+        bitmap=bytearray()
+        line=bytearray(b'\x01')*width
+        line[1::2]=bytes(walls[:cols]).translate(closed[_N])
+        bitmap+=line
+        for r in range(rows):
+            row=bytes(walls[r*cols:(r+1)*cols])
+            line=bytearray(width)
+            line[0]=closed[_W][row[0]]
+            line[2:-1:2]=either(row[:-1].translate(closed[_E]),row[1:].translate(closed[_W]))
+            line[-1]=closed[_E][row[-1]]
+            bitmap+=line
+            line=bytearray(b'\x01')*width
+            if r<rows-1:
+                below=bytes(walls[(r+1)*cols:(r+2)*cols])
+                line[1::2]=either(row.translate(closed[_S]),below.translate(closed[_N]))
+            else:
+                line[1::2]=row.translate(closed[_S])
+            bitmap+=line
+        ppm=bytearray(3*len(bitmap))
+        for i in range(3):
+            ppm[i::3]=bitmap.translate(bytes((background[i],wall[i]))+bytes(254))
+        return b'P6 %d %d 255\n'%(width,2*rows+1)+ppm
     def _redrawCell(self,x,y,theme):
         '''
         To redraw a cell.
@@ -667,22 +1604,24 @@ class maze:
         So the cell is redrawn so that cell lines are on top
         '''
         w=self._cell_width
-        cell=(x,y)
+        v=self._walls[(x-1)*self.cols+y-1]
         x=x*w-w+self._LabWidth
         y=y*w-w+self._LabWidth
-        if self.maze_map[cell]['E']==False:
+        if not v&_E:
             self._canvas.create_line(y + w, x, y + w, x + w,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['W']==False:
+        if not v&_W:
             self._canvas.create_line(y, x, y, x + w,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['N']==False:
+        if not v&_N:
             self._canvas.create_line(y, x, y + w, x,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['S']==False:
+        if not v&_S:
             self._canvas.create_line(y, x + w, y + w, x + w,width=2,fill=theme.value[1])
 
     def enableArrowKey(self,a):
         '''
         To control an agent a with Arrow Keys
         '''
+        if self.headless:
+            return
         self._win.bind('<Left>',a.moveLeft)
         self._win.bind('<Right>',a.moveRight)
         self._win.bind('<Up>',a.moveUp)
@@ -692,6 +1631,8 @@ class maze:
         '''
         To control an agent a with keys W,A,S,D
         '''
+        if self.headless:
+            return
         self._win.bind('<a>',a.moveLeft)
         self._win.bind('<d>',a.moveRight)
         self._win.bind('<w>',a.moveUp)
@@ -699,196 +1640,521 @@ class maze:
 
 
 
-    _tracePathList=[]
-    def _tracePathSingle(self,a,p,kill,showMarked,delay):
+    def _killAgent(self,a):
         '''
-        An interal method to help tracePath method for tracing a path by agent.
+        To remove the agent a (head and footprints) from the Maze.
+        Used when the agent should be killed after it reaches the Goal or completes the path.
         '''
-        
-        def killAgent(a):
-            '''
-            if the agent should be killed after it reaches the Goal or completes the path
-            '''
-            for i in range(len(a._body)):
-                self._canvas.delete(a._body[i])
-            self._canvas.delete(a._head) 
-        w=self._cell_width
-        if((a.x,a.y) in self.markCells and showMarked):
-            w=self._cell_width
-            x=a.x*w-w+self._LabWidth
-            y=a.y*w-w+self._LabWidth
-            self._canvas.create_oval(y + w/2.5+w/20, x + w/2.5+w/20,y + w/2.5 +w/4-w/20, x + w/2.5 +w/4-w/20,fill='red',outline='red',tag='ov')
-            self._canvas.tag_raise('ov')
-       
-        if (a.x,a.y)==(a.goal):
-            del maze._tracePathList[0][0][a]
-            if maze._tracePathList[0][0]=={}:
-                del maze._tracePathList[0]
-                if len(maze._tracePathList)>0:
-                    self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-            if kill:
-                self._win.after(300, killAgent,a)         
+        if self._viewport is not None:
+            self._viewport.killAgent(a)
+            return
+        for i in range(len(a._body)):
+            self._canvas.delete(a._body[i])
+        self._canvas.delete(a._head)
+    def _markCell(self,x,y):
+        '''
+        To show the marked cell (x,y) with a red dot while tracing a path.
+        '''
+        if self._viewport is not None:
+            self._viewport.mark((x,y))
             return
+        w=self._cell_width
+        x=x*w-w+self._LabWidth
+        y=y*w-w+self._LabWidth
+        self._canvas.create_oval(y + w/2.5+w/20, x + w/2.5+w/20,y + w/2.5 +w/4-w/20, x + w/2.5 +w/4-w/20,fill='red',outline='red',tag='ov')
+        self._canvas.tag_raise('ov')
+    def _footprint(self,a,cell):
+        '''
+        To leave the footprint of agent a on a cell it only passed through
+        inside a frame (see _traceFrame). The same as the footprint the agent
+        itself leaves behind on its previous cell.
+        '''
+        w=self._cell_width
+        x=cell[0]*w-w+self._LabWidth
+        y=cell[1]*w-w+self._LabWidth
+        if a.filled:
+            coord=(y, x,y + w, x + w)
+        else:
+            coord=(y + w/2.5, x + w/2.5,y + w/2.5 +w/4, x + w/2.5 +w/4)
+        item=self._canvas.create_rectangle(*coord,fill=a.color.value[1],outline='')
+        try:
+            self._canvas.tag_lower(item,'ov')
+        except:
+            pass
+        a._body.append(item)
+        if a.filled:
+            self._redrawCell(*cell,self.theme)
+    @staticmethod
+    def _turn(a,mov):
+        '''
+        To turn the arrow agent a one step towards the direction mov
+        (0,1,2,3 for N,E,S,W). Returns True if it already faces mov.
+        '''
+        d=mov-a._orient
+        if d==0:
+            return True
+        if d in (1,2,-2,-3):
+            a._RCW()
+        else:
+            a._RCCW()
+        return False
+    def _traceStep(self,a,p,move):
+        '''
+        An internal method to move the agent a one step on its path p
+        (dictionary, string or list). The agent is moved by calling move(cell).
+        Returns the rest of the path or None if the agent has completed it.
+        '''
+        if (a.x,a.y)==a.goal or len(p)==0:
+            return None
+        cell=(a.x,a.y)
         # If path is provided as Dictionary
-        if(type(p)==dict):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
-                return
+        if type(p)==dict:
+            new=p[cell]
             if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[(a.x,a.y)]
-                o=a._orient
-                
-                if old!=new:
-                    if old[0]==new[0]:
-                        if old[1]>new[1]:
-                            mov=3#'W' #3
-                        else:
-                            mov=1#'E' #1
-                    else:
-                        if old[0]>new[0]:
-                            mov=0#'N' #0
-
-                        else:
-                            mov=2#'S' #2
-                    if mov-o==2:
-                        a._RCW()
-
-                    if mov-o==-2:
-                        a._RCW()
-                    if mov-o==1:
-                        a._RCW()
-                    if mov-o==-1:
-                        a._RCCW()
-                    if mov-o==3:
-                        a._RCCW()
-                    if mov-o==-3:
-                        a._RCW()
-                    if mov==o:
-                        a.x,a.y=p[(a.x,a.y)]
-                else:
-                    del p[(a.x,a.y)]
-            else:    
-                a.x,a.y=p[(a.x,a.y)]
+                if cell==new:
+                    del p[cell]
+                elif self._turn(a,(0 if new[0]<cell[0] else 2) if new[0]!=cell[0] else (3 if new[1]<cell[1] else 1)):
+                    move(new)
+            else:
+                move(new)
         # If path is provided as String
-        if (type(p)==str):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
-                if maze._tracePathList[0][0]=={}:
-                    del maze._tracePathList[0]
-                    if len(maze._tracePathList)>0:
-                        self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-                if kill:
-                    
-                    self._win.after(300, killAgent,a)         
-                return
-            if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[0]
-                o=a._orient
-                if new=='N': mov=0
-                elif new=='E': mov=1
-                elif new=='S': mov=2
-                elif new=='W': mov=3
-                
-                if mov-o==2:
-                    a._RCW()
-
-                if mov-o==-2:
-                    a._RCW()
-                if mov-o==1:
-                    a._RCW()
-                if mov-o==-1:
-                    a._RCCW()
-                if mov-o==3:
-                    a._RCCW()
-                if mov-o==-3:
-                    a._RCW()
-            if a.shape=='square' or mov==o:    
-                move=p[0]
-                if move=='E':
-                    if a.y+1<=self.cols:
-                        a.y+=1
-                elif move=='W':
-                    if a.y-1>0:
-                        a.y-=1
-                elif move=='N':
-                    if a.x-1>0:
-                        a.x-=1
-                        a.y=a.y
-                elif move=='S':
-                    if a.x+1<=self.rows:
-                        a.x+=1
-                        a.y=a.y
-                elif move=='C':
-                    a._RCW()
-                elif move=='A':
-                    a._RCCW()
-                p=p[1:]
+        elif type(p)==str:
+            step=p[0]
+            if step=='C':
+                a._RCW()
+            elif step=='A':
+                a._RCCW()
+            elif a.shape=='arrow' and not self._turn(a,'NESW'.index(step)):
+                return p
+            else:
+                x,y=cell
+                if step=='E' and y+1<=self.cols: y+=1
+                elif step=='W' and y-1>0: y-=1
+                elif step=='N' and x-1>0: x-=1
+                elif step=='S' and x+1<=self.rows: x+=1
+                if (x,y)!=cell:
+                    move((x,y))
+            p=p[1:]
         # If path is provided as List
-        if (type(p)==list):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
-                if maze._tracePathList[0][0]=={}:
-                    del maze._tracePathList[0]
-                    if len(maze._tracePathList)>0:
-                        self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-                if kill:                    
-                    self._win.after(300, killAgent,a)  
-                return
+        elif type(p)==list:
+            new=p[0]
             if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[0]
-                o=a._orient
-                
-                if old!=new:
-                    if old[0]==new[0]:
-                        if old[1]>new[1]:
-                            mov=3#'W' #3
-                        else:
-                            mov=1#'E' #1
-                    else:
-                        if old[0]>new[0]:
-                            mov=0#'N' #0
-
-                        else:
-                            mov=2#'S' #2
-                    if mov-o==2:
-                        a._RCW()
-
-                    elif mov-o==-2:
-                        a._RCW()
-                    elif mov-o==1:
-                        a._RCW()
-                    elif mov-o==-1:
-                        a._RCCW()
-                    elif mov-o==3:
-                        a._RCCW()
-                    elif mov-o==-3:
-                        a._RCW()
-                    elif mov==o:
-                        a.x,a.y=p[0]
-                        del p[0]
-                else:
+                if cell==new:
+                    del p[0]
+                elif self._turn(a,(0 if new[0]<cell[0] else 2) if new[0]!=cell[0] else (3 if new[1]<cell[1] else 1)):
+                    move(new)
                     del p[0]
-            else:    
-                a.x,a.y=p[0]
+            else:
+                move(new)
                 del p[0]
-
-        self._win.after(delay, self._tracePathSingle,a,p,kill,showMarked,delay)    
-
-    def tracePath(self,d,kill=False,delay=300,showMarked=False):
+        return p
+    def _traceFrame(self):
+        '''
+        The single animation clock of tracePath.
+        Every frame moves every agent of the current tracePath call
+        steps_per_frame steps and then schedules the next frame. The cells a
+        square agent passes through inside a frame only get their footprints,
+        the agent itself is drawn once per frame.
+        '''
+        d,kill,delay,showMarked,steps=self._traceQueue[0]
+        marked=set(self.markCells) if showMarked else ()
+        for a in list(d):
+            p=d[a]
+            start=(a.x,a.y)
+            passed=[]
+            if self._viewport is None and a.shape=='square' and steps>1:
+                def move(cell):
+                    a._x,a._y=cell
+                    passed.append(cell)
+            else:
+                def move(cell):
+                    a.position=cell
+            for _ in range(steps):
+                if (a.x,a.y) in marked:
+                    self._markCell(a.x,a.y)
+                p=self._traceStep(a,p,move)
+                if p is None:
+                    break
+            if passed:
+                end=(a.x,a.y)
+                a._x,a._y=start
+                if a.footprints:
+                    for cell in passed[:-1]:
+                        self._footprint(a,cell)
+                a.position=end
+            if p is None:
+                del d[a]
+                if kill:
+                    self._win.after(300,self._killAgent,a)
+            else:
+                d[a]=p
+        if d:
+            self._win.after(delay,self._traceFrame)
+        else:
+            del self._traceQueue[0]
+            self._startTrace()
+    def _startTrace(self):
+        '''
+        To start the next queued tracePath call.
+        The agents already on their goal or with an empty path are not traced.
+        '''
+        while self._traceQueue:
+            d=self._traceQueue[0][0]
+            for a in list(d):
+                if a.goal==(a.x,a.y) or len(d[a])==0:
+                    del d[a]
+            if d:
+                self._traceFrame()
+                return
+            del self._traceQueue[0]
+    def tracePath(self,d,kill=False,delay=300,showMarked=False,steps_per_frame=1):
         '''
         A method to trace path by agent
         You can provide more than one agent/path details
+        kill-->     To remove the agents when they complete their paths
+        delay-->    The time between two frames in milliseconds
+        showMarked-->   To show the markCells the agents pass through
+        steps_per_frame-->  Number of steps every agent moves in a frame
+                    Higher values skip frames to animate long paths faster
+        All the agents are moved together by a single frame clock and the
+        successive tracePath calls are traced one after the other.
+        The paths passed are copied, not consumed.
+        In headless mode there is nothing to animate, so nothing is traced.
         '''
-        self._tracePathList.append((d,kill,delay))
-        if maze._tracePathList[0][0]==d: 
-            for a,p in d.items():
-                if a.goal!=(a.x,a.y) and len(p)!=0:
-                    self._tracePathSingle(a,p,kill,showMarked,delay)
+        if self.headless:
+            return
+        d={a:(p.copy() if type(p)!=str else p) for a,p in d.items()}
+        self._traceQueue.append((d,kill,delay,showMarked,max(1,int(steps_per_frame))))
+        if len(self._traceQueue)==1:
+            self._startTrace()
     def run(self):
         '''
         Finally to run the Tkinter Main Loop
         '''
-        self._win.mainloop()
\ No newline at end of file
+        if self.headless:
+            return
+        self._win.mainloop()
+
+def _ellerRows(rows,cols,rng):
+    '''
+    Eller's algorithm.
+    Generates a perfect maze one row at a time and yields every row as a
+    bytearray of cols wall bytes (same bits as maze._walls), so only O(cols)
+    memory is used whatever the number of rows.
+    rng-->  The random number generator (random module or random.Random)
+    '''
+    sets=list(range(cols)) # Set of every cell of the current row
+    down=bytearray(cols) # Cells of the previous row open to the South
+    for x in range(rows):
+        last=x==rows-1
+        row=bytearray(cols)
+        for y in range(cols):
+            if down[y]:
+                row[y]|=_N
+        # Union-Find over the set labels of this row (all labels are <2*cols)
+        parent=list(range(2*cols))
+        def find(a):
+            while parent[a]!=a:
+                parent[a]=parent[parent[a]]
+                a=parent[a]
+            return a
+        # Join neighbours of different sets (all of them in the last row)
+        for y in range(cols-1):
+            a=find(sets[y])
+            b=find(sets[y+1])
+            if a!=b and (last or rng.random()<0.5):
+                row[y]|=_E
+                row[y+1]|=_W
+                parent[b]=a
+        if last:
+            yield row
+            return
+        # Every set goes down at least once
+        members={}
+        for y in range(cols):
+            sets[y]=find(sets[y])
+            members.setdefault(sets[y],[]).append(y)
+        down=bytearray(cols)
+        for cells in members.values():
+            going=[y for y in cells if rng.random()<0.5]
+            if not going:
+                going=[rng.choice(cells)]
+            for y in going:
+                down[y]=1
+                row[y]|=_S
+        # Cells going down keep their set, the rest get new sets for next row
+        labels={}
+        for y in range(cols):
+            if down[y]:
+                sets[y]=labels.setdefault(sets[y],len(labels))
+            else:
+                sets[y]=cols+y
+        yield row
+
+def ellerMaze(rows,cols,filename=None,callback=None,goal=(1,1),seed=None):
+    '''
+    To generate a rows x cols perfect maze with Eller's algorithm without
+    ever holding it in memory, e.g. for mazes larger than RAM.
+    filename--> The rows are written straight into this binary .maze file,
+                which can be opened later with CreateMaze(loadMaze=filename)
+    callback--> Called as callback(x,row) for every row x (1 to rows) with
+                a bytearray of the cols wall bytes of the row
+    goal-->     Goal stored in the file header
+    seed-->     Seed of a local random number generator, stored in the file
+                header. The same seed gives the same maze again, the same as
+                CreateMaze(algorithm='eller',seed=seed).
+    '''
+    rng=random if seed is None else random.Random(seed)
+    f=None
+    if filename is not None:
+        f=open(filename,'wb')
+        headerSeed=seed if isinstance(seed,int) and 0<=seed<2**63 else -1
+        f.write(_HEADER.pack(_MAGIC,_VERSION,rows,cols,*goal,headerSeed))
+    try:
+        for x,row in enumerate(_ellerRows(rows,cols,rng),1):
+            if f is not None:
+                f.write(row)
+            if callback is not None:
+                callback(x,row)
+    finally:
+        if f is not None:
+            f.close()
+
+
+# Maze generators used by CreateMaze(algorithm=...)
+# Each one is called as generator(m,rng,x,y,pattern) and opens the walls of
+# the perfect maze straight in m._walls. (x,y) is the goal of the maze and
+# pattern the 'v'/'h' bias, which the generators may ignore. If the
+# generator does not set m.path, it is calculated on first use.
+GENERATORS={}
+
+def registerGenerator(name):
+    '''
+    Decorator to add a maze generator to GENERATORS under the given name
+    '''
+    def register(f):
+        GENERATORS[name]=f
+        return f
+    return register
+
+def generatorTimes(rows,cols,algorithms=None,repeat=1):
+    '''
+    To compare the maze generators.
+    Generates headless rows x cols mazes with every algorithm (all of
+    GENERATORS by default) and returns {algorithm: best time in seconds}.
+    '''
+    times={}
+    for a in (algorithms or GENERATORS):
+        for _ in range(repeat):
+            m=maze(rows,cols,headless=True)
+            m.CreateMaze(algorithm=a)
+            times[a]=min(times.get(a,m.generationTime),m.generationTime)
+    return times
+
+@registerGenerator('backtracker')
+def _backtrackerGenerator(m,rng,x,y,pattern):
+    m._backtracker(x,y,pattern,rng)
+
+@registerGenerator('eller')
+def _ellerGenerator(m,rng,x,y,pattern):
+    cols=m.cols
+    for r,row in enumerate(_ellerRows(m.rows,cols,rng)):
+        m._walls[r*cols:(r+1)*cols]=row
+    m.path=None
+
+@registerGenerator('kruskal')
+def _kruskalGenerator(m,rng,x,y,pattern):
+    '''
+    Kruskal's algorithm: the walls are removed in random order when they
+    separate two different trees, kept in a Union-Find with path halving.
+    '''
+    rows,cols,walls=m.rows,m.cols,m._walls
+    n=rows*cols
+    # Wall 2*i is the East wall of cell i and 2*i+1 its South wall
+    edges=[2*i for i in range(n) if i%cols!=cols-1]
+    edges+=[2*i+1 for i in range(n-cols)]
+    rng.shuffle(edges)
+    parent=list(range(n))
+    joined=0
+    for e in edges:
+        a=e>>1
+        b=a+cols if e&1 else a+1
+        ra=a
+        while parent[ra]!=ra:
+            parent[ra]=parent[parent[ra]]
+            ra=parent[ra]
+        rb=b
+        while parent[rb]!=rb:
+            parent[rb]=parent[parent[rb]]
+            rb=parent[rb]
+        if ra==rb:
+            continue
+        parent[rb]=ra
+        if e&1:
+            walls[a]|=_S
+            walls[b]|=_N
+        else:
+            walls[a]|=_E
+            walls[b]|=_W
+        joined+=1
+        if joined==n-1:
+            break
+    m.path=None
+
+@registerGenerator('wilson')
+def _wilsonGenerator(m,rng,x,y,pattern):
+    '''
+    Wilson's algorithm: loop erased random walks from every cell not in the
+    maze yet, until they hit the maze. Gives a uniform spanning tree.
+    '''
+    rows,cols,walls=m.rows,m.cols,m._walls
+    n=rows*cols
+    inMaze=bytearray(n)
+    # Exit direction of every cell on the current walk, 0-3 for E,W,N,S
+    exitDir=bytearray(n)
+    step=(1,-1,-cols,cols)
+    bits=((_E,_W),(_W,_E),(_N,_S),(_S,_N))
+    inMaze[rng.randrange(n)]=1
+    randrange=rng.randrange
+    for start in range(n):
+        if inMaze[start]:
+            continue
+        # Random walk; revisiting a cell overwrites its exit (erases the loop)
+        i=start
+        while not inMaze[i]:
+            while True:
+                d=randrange(4)
+                if d==0 and i%cols!=cols-1: break
+                if d==1 and i%cols!=0: break
+                if d==2 and i>=cols: break
+                if d==3 and i<n-cols: break
+            exitDir[i]=d
+            i+=step[d]
+        # Add the loop erased walk to the maze
+        i=start
+        while not inMaze[i]:
+            d=exitDir[i]
+            inMaze[i]=1
+            walls[i]|=bits[d][0]
+            i+=step[d]
+            walls[i]|=bits[d][1]
+    m.path=None
+
+@registerGenerator('binarytree')
+def _binaryTreeGenerator(m,rng,x,y,pattern):
+    '''
+    Binary tree: every cell opens either its North or its West wall.
+    Biased (open first row and column) but a single O(n) pass.
+    '''
+    rows,cols,walls=m.rows,m.cols,m._walls
+    i=0
+    for r in range(rows):
+        for c in range(cols):
+            if r>0 and (c==0 or rng.random()<0.5):
+                walls[i]|=_N
+                walls[i-cols]|=_S
+            elif c>0:
+                walls[i]|=_W
+                walls[i-1]|=_E
+            i+=1
+    m.path=None
+
+@registerGenerator('sidewinder')
+def _sidewinderGenerator(m,rng,x,y,pattern):
+    '''
+    Sidewinder: every row is cut into runs of cells open to the East and
+    each run opens the North wall of one of its cells. The first row is a
+    single corridor. A single O(n) pass.
+    '''
+    rows,cols,walls=m.rows,m.cols,m._walls
+    for r in range(rows):
+        runStart=r*cols
+        for c in range(cols):
+            i=r*cols+c
+            if c<cols-1 and (r==0 or rng.random()<0.5):
+                walls[i]|=_E
+                walls[i+1]|=_W
+            elif r>0:
+                j=rng.randint(runStart,i)
+                walls[j]|=_N
+                walls[j-cols]|=_S
+                runStart=i+1
+    m.path=None
+
+
+class MazeCache:
+    '''
+    On disk cache of generated mazes, used with CreateMaze(seed=...,cache=...).
+    Every maze is a binary .maze file named after the hash of its key
+    (rows, cols, goal, pattern, loopPercent, algorithm, seed), so a cached maze
+    opens instantly with memory mapping. The least recently used files are
+    deleted when the cache grows beyond maxBytes.
+    '''
+    def __init__(self,directory='maze_cache',maxBytes=1<<30):
+        '''
+        directory-->    The folder of the cache, created if needed
+        maxBytes-->     Maximum total size of the cached files
+        '''
+        self.directory=directory
+        self.maxBytes=maxBytes
+        os.makedirs(directory,exist_ok=True)
+    def _file(self,key):
+        h=hashlib.sha1(repr((_VERSION,)+tuple(key)).encode()).hexdigest()
+        return os.path.join(self.directory,f'{h}.maze')
+    def get(self,key):
+        '''
+        Returns the file of the cached maze (marked as recently used) or None
+        '''
+        f=self._file(key)
+        try:
+            os.utime(f)
+        except FileNotFoundError:
+            return None
+        return f
+    def put(self,key,m):
+        '''
+        To add the maze m to the cache and evict the least recently used mazes
+        '''
+        f=self._file(key)
+        tmp=f'{f}.{os.getpid()}.tmp'
+        m.saveBinary(tmp)
+        try:
+            os.replace(tmp,f)
+        except PermissionError:
+            # On Windows a file can't be replaced while a maze maps it. It
+            # is the same maze, put there by another process.
+            os.remove(tmp)
+        self._evict(keep=f)
+    def _evict(self,keep=None):
+        files=[]
+        total=0
+        for e in os.scandir(self.directory):
+            if e.name.endswith('.maze'):
+                st=e.stat()
+                files.append((st.st_mtime,st.st_size,e.path))
+                total+=st.st_size
+        files.sort()
+        for _,size,path in files:
+            if total<=self.maxBytes:
+                break
+            if path==keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                # Still mapped by a maze (Windows), it is left for later
+                continue
+            total-=size
+    def clear(self):
+        '''
+        To delete all the cached mazes, but the ones still mapped by a maze
+        on Windows
+        '''
+        for e in os.scandir(self.directory):
+            if e.name.endswith('.maze'):
+                try:
+                    os.remove(e.path)
+                except (FileNotFoundError,PermissionError):
+                    pass
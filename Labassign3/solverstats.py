@@ -0,0 +1,77 @@
+import time
+import tracemalloc
+
+
+class SolverStats:
+    """
+    Work counters of one solver run.
+
+    The solvers (BFS, DFS, aStar, jumpPointSearch, biBFS, biAStar,
+    junctionSearch, idaStar, IDDFS, DStarLite.path) take it as their
+    optional stats argument and fill in the counters when they finish.
+    run() also measures the time and the memory of the run.
+
+    Attributes:
+        expanded (int): Cells (or junctions) taken off the frontier and expanded
+        pushed (int): Cells (or junctions) put on the frontier, the start included
+        peak_frontier (int): Largest size of the frontier
+        peak_memory (int): Peak memory allocated during run() in bytes (tracemalloc)
+        time_ns (int): Time of run() in nanoseconds (perf_counter_ns)
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Set all the counters to 0"""
+        self.expanded = 0
+        self.pushed = 0
+        self.peak_frontier = 0
+        self.peak_memory = 0
+        self.time_ns = 0
+
+    def run(self, solver, m, *args, trace_memory=True, **kwargs):
+        """
+        Run a solver on a maze and measure it
+
+        Args:
+            solver (callable): The solver, e.g. BFS
+            m (maze): The maze to solve
+            *args, **kwargs: More arguments of the solver (start, goal)
+            trace_memory (bool): Measure the peak memory with tracemalloc.
+                It makes the solver several times slower, so time_ns is
+                only meaningful without it.
+
+        Returns:
+            The path found by the solver
+        """
+        self.reset()
+        tracing = trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        try:
+            path = solver(m, *args, stats=self, **kwargs)
+        finally:
+            self.time_ns = time.perf_counter_ns() - start
+            if trace_memory:
+                self.peak_memory = tracemalloc.get_traced_memory()[1] - base
+            if tracing:
+                tracemalloc.stop()
+        return path
+
+    def as_dict(self):
+        """The counters as a dictionary"""
+        return {
+            'expanded': self.expanded,
+            'pushed': self.pushed,
+            'peak_frontier': self.peak_frontier,
+            'peak_memory': self.peak_memory,
+            'time_ns': self.time_ns,
+        }
+
+    def __repr__(self):
+        return f"SolverStats({', '.join(f'{k}={v}' for k, v in self.as_dict().items())})"
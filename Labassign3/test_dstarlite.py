@@ -0,0 +1,43 @@
+import random
+from pyMaze import maze
+from bfs import BFS
+from dstarlite import DStarLite
+
+
+def bfs_length(m, start, goal):
+    try:
+        return len(BFS(m, start, goal))
+    except KeyError:
+        return None
+
+
+def planned_length(planner):
+    try:
+        return len(planner.path())
+    except KeyError:
+        return None
+
+
+def test_move_start_and_flip_walls_match_bfs():
+    rng = random.Random(1)
+    for seed in range(300):
+        rows, cols = rng.randint(2, 10), rng.randint(2, 10)
+        m = maze(rows, cols, headless=True)
+        m.CreateMaze(loopPercent=rng.choice([20, 50, 100]), algorithm='kruskal', seed=seed)
+        start = (rng.randint(1, rows), rng.randint(1, cols))
+        goal = (rng.randint(1, rows), rng.randint(1, cols))
+        planner = DStarLite(m, start, goal)
+        for _ in range(15):
+            assert planned_length(planner) == bfs_length(m, start, goal)
+            if rng.random() < 0.5:
+                # Anywhere, not only along the path
+                start = (rng.randint(1, rows), rng.randint(1, cols))
+                planner.moveStart(start)
+            else:
+                cell = (rng.randint(1, rows), rng.randint(1, cols))
+                side = rng.choice('ESNW')
+                try:
+                    planner.setWall(cell, side, rng.random() < 0.5)
+                except ValueError:
+                    pass
+        assert planned_length(planner) == bfs_length(m, start, goal)
@@ -0,0 +1,24 @@
+import random
+from pyMaze import maze
+from bfs import BFS
+from junction import junctionSearch
+
+
+def test_start_at_junction_goal_in_corridor():
+    # The goal is next to the start, inside a corridor the start's edges
+    # walk past
+    m = maze(3, 4, headless=True)
+    m.CreateMaze(loopPercent=50, algorithm='kruskal', seed=149)
+    assert junctionSearch(m, (1, 2), (1, 1)) == {(1, 2): (1, 1)}
+
+
+def test_path_lengths_match_bfs():
+    rng = random.Random(0)
+    for seed in range(500):
+        rows, cols = rng.randint(2, 8), rng.randint(2, 8)
+        m = maze(rows, cols, headless=True)
+        m.CreateMaze(loopPercent=rng.choice([0, 20, 50, 100]),
+                     algorithm=rng.choice(['backtracker', 'kruskal', 'wilson']), seed=seed)
+        start = (rng.randint(1, rows), rng.randint(1, cols))
+        goal = (rng.randint(1, rows), rng.randint(1, cols))
+        assert len(junctionSearch(m, start, goal)) == len(BFS(m, start, goal))